@@ -0,0 +1,153 @@
+"""Fingerprint and precompress the dashboard's static assets.
+
+Runs after build_dashboard.py: the inline <style> and <script> in
+docs/index.html are moved out to docs/assets/, and they and every chart image
+the page references are copied to content-hashed names (flow_7d.3f9a1c0b2e.png).
+The references are then rewritten to point at those copies. A name only
+changes when its bytes do, so browsers and CDNs can cache the copies forever
+and repeat visits only fetch what changed.
+
+Text assets (and index.html itself) get .gz siblings, plus .br siblings when
+the optional brotli package is installed. PNG/WebP are already compressed
+and are copied as-is. docs/assets/manifest.json maps each logical name to its
+fingerprinted file. Fingerprinted files the page no longer references are
+removed.
+
+Usage: python build_assets.py
+"""
+import gzip
+import hashlib
+import json
+import os
+import re
+
+try:
+    import brotli
+except ImportError:  # optional — .gz siblings are always written
+    brotli = None
+
+DOCS = "docs"
+ASSET_DIR = os.path.join(DOCS, "assets")
+MANIFEST = os.path.join(ASSET_DIR, "manifest.json")
+INDEX = os.path.join(DOCS, "index.html")
+
+HASH_LEN = 10
+COMPRESSIBLE = (".css", ".js", ".html", ".json", ".svg")
+
+_STYLE_RE = re.compile(r"<style>(.*?)</style>", re.S)
+_SCRIPT_RE = re.compile(r"<script>(.*?)</script>", re.S)
+# src="…", href="…" and each URL in srcset="…" that names a local image
+_REF_RE = re.compile(r'((?:src|href)=")([^":?#]+\.(?:png|webp))(")')
+_SRCSET_RE = re.compile(r'(srcset=")([^"]*)(")')
+
+
+def _digest(data):
+    return hashlib.sha256(data).hexdigest()[:HASH_LEN]
+
+
+def _fingerprinted(logical, data):
+    """Return the assets/ path for *data* under *logical*'s name, writing it if new."""
+    stem, ext = os.path.splitext(os.path.basename(logical))
+    rel = f"assets/{stem}.{_digest(data)}{ext}"
+    path = os.path.join(DOCS, rel)
+    if not os.path.exists(path):
+        os.makedirs(ASSET_DIR, exist_ok=True)
+        tmp = path + ".tmp"
+        with open(tmp, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+    return rel
+
+
+def _write_siblings(path):
+    """Write deterministic .gz (and .br when available) copies of *path* next to it."""
+    with open(path, "rb") as f:
+        data = f.read()
+    siblings = {".gz": gzip.compress(data, compresslevel=9, mtime=0)}
+    if brotli is not None:
+        siblings[".br"] = brotli.compress(data, quality=11)
+    for ext, packed in siblings.items():
+        target = path + ext
+        try:
+            with open(target, "rb") as f:
+                if f.read() == packed:
+                    continue
+        except OSError:
+            pass
+        with open(target + ".tmp", "wb") as f:
+            f.write(packed)
+        os.replace(target + ".tmp", target)
+
+
+def build() -> dict[str, str]:
+    """Fingerprint everything docs/index.html references and rewrite it. Returns the manifest."""
+    with open(INDEX, encoding="utf-8") as f:
+        html = f.read()
+    manifest = {}
+
+    def extract(regex, logical, tag):
+        nonlocal html
+        m = regex.search(html)
+        if m:
+            rel = _fingerprinted(logical, m.group(1).encode())
+            manifest[logical] = rel
+            html = html[:m.start()] + tag.format(rel) + html[m.end():]
+
+    extract(_STYLE_RE, "dashboard.css", '<link rel="stylesheet" href="{}">')
+    extract(_SCRIPT_RE, "dashboard.js", '<script src="{}"></script>')
+
+    def image(url):
+        path = os.path.join(DOCS, url)
+        if url.startswith("assets/") or not os.path.exists(path):
+            return url
+        with open(path, "rb") as f:
+            manifest[url] = _fingerprinted(url, f.read())
+        return manifest[url]
+
+    def srcset(value):
+        candidates = (c.split() for c in value.split(",") if c.strip())
+        return ", ".join(" ".join([image(url), *descriptor]) for url, *descriptor in candidates)
+
+    html = _REF_RE.sub(lambda m: m.group(1) + image(m.group(2)) + m.group(3), html)
+    html = _SRCSET_RE.sub(lambda m: m.group(1) + srcset(m.group(2)) + m.group(3), html)
+
+    tmp = INDEX + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(html)
+    os.replace(tmp, INDEX)
+
+    # Keep entries from an earlier run that the (already rewritten) page still points at
+    referenced = set(re.findall(r'assets/[^"\s,]+', html))
+    if os.path.exists(MANIFEST):
+        with open(MANIFEST) as f:
+            for logical, rel in json.load(f).items():
+                if rel in referenced:
+                    manifest.setdefault(logical, rel)
+    os.makedirs(ASSET_DIR, exist_ok=True)
+    with open(MANIFEST + ".tmp", "w") as f:
+        json.dump(dict(sorted(manifest.items())), f, indent=2)
+        f.write("\n")
+    os.replace(MANIFEST + ".tmp", MANIFEST)
+
+    keep = set(manifest.values()) | {"assets/manifest.json"}
+    for name in os.listdir(ASSET_DIR):
+        rel = f"assets/{name}"
+        base = rel.removesuffix(".gz").removesuffix(".br")
+        if base not in keep:
+            os.remove(os.path.join(ASSET_DIR, name))
+        elif base == rel and rel.endswith(COMPRESSIBLE):
+            _write_siblings(os.path.join(DOCS, rel))
+    _write_siblings(INDEX)
+    return manifest
+
+
+def main():
+    if not os.path.exists(INDEX):
+        raise SystemExit(f"❌ {INDEX} not found — run build_dashboard.py first")
+    manifest = build()
+    br = "" if brotli is not None else " (brotli not installed — .gz only)"
+    print(f"✅ Fingerprinted {len(manifest)} asset(s) into {ASSET_DIR}{br}")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,27 +2,43 @@
 
 Run nightly after update_plots.py: python build_dashboard.py
 """
-import csv
+import copy
 import datetime
+import functools
+import hashlib
+import json
+import math
 import os
+import re
+import struct
+from bisect import bisect_left, bisect_right
+from collections.abc import Sequence
+from dataclasses import dataclass
+from itertools import groupby
 
-import pytz
-import requests
+from zoneinfo import ZoneInfo
 
-from seasons_loader import get_current_season, get_rate
+import numpy as np
+
+import flume_index
+import log_cache
+from seasons_loader import get_current_season, index as season_index
 
 DOCS = "docs"
+RAW_DATA_DIR = os.path.join(DOCS, "data")
+FRAGMENT_DIR = os.path.join(log_cache.CACHE_DIR, "fragments")
 FLUME_CSV   = "logs/flume_usage_log.csv"
 LESLIES_CSV = "logs/leslies-log.csv"
 FLOW_CSV    = "logs/flow.csv"
 
-SLACK_TOKEN       = os.getenv("SLACK_BOT_TOKEN")
 SLACK_CHANNEL     = os.getenv("SLACK_CHANNEL")
 SLACK_BOARD_CH    = os.getenv("SLACK_BOARD_CHANNEL")
 HEARTBEAT_CHANNEL = os.getenv("SLACK_HEARTBEAT_CHANNEL")
 
 # How many raw flow readings to show in the Pump House table
 FLOW_TABLE_ROWS = 96
+# Rows per page in the lazily loaded Raw tab tables
+RAW_PAGE_ROWS = 100
 
 CSS = """
 * { box-sizing: border-box; margin: 0; padding: 0; }
@@ -67,14 +83,82 @@ li { margin: 4px 0; line-height: 1.5; }
 .status.off  { background: #e9ecef; color: #495057; }
 .notice { background: #e9ecef; border-left: 3px solid #aaa; padding: 8px 14px;
           margin: 0 0 16px; border-radius: 3px; font-size: 13px; color: #495057; }
+.pager { display: flex; gap: 10px; align-items: center; margin: -10px 0 20px; font-size: 13px; }
+.pager button { padding: 4px 12px; border: 1px solid #ccc; border-radius: 4px;
+                background: #f4f6f8; cursor: pointer; }
+.pager button:disabled { opacity: 0.5; cursor: default; }
 """
 
 JS = """
+let rawLoaded = false;
 function showTab(id) {
     document.querySelectorAll('.tab-pane').forEach(p => p.classList.remove('active'));
     document.querySelectorAll('.tab-btn').forEach(b => b.classList.remove('active'));
     document.getElementById(id).classList.add('active');
     document.getElementById('btn-' + id).classList.add('active');
+    if (id === 'raw' && !rawLoaded) { rawLoaded = true; loadRaw(); }
+}
+async function fetchJSON(url, opts) {
+    const r = await fetch(url, opts);
+    if (!r.ok) throw new Error(url + ': ' + r.status);
+    return r.json();
+}
+async function loadRaw() {
+    const box = document.getElementById('raw-tables');
+    try {
+        const manifest = await fetchJSON('data/manifest.json', {cache: 'no-cache'});
+        box.textContent = '';
+        for (const t of manifest.tables) box.appendChild(rawTable(t, manifest.page_rows));
+    } catch (e) {
+        box.innerHTML = '<p class="note">Raw data could not be loaded.</p>';
+        rawLoaded = false;
+    }
+}
+function rawTable(t, pageRows) {
+    const sec = document.createElement('section');
+    const h = sec.appendChild(document.createElement('h3'));
+    h.textContent = t.title;
+    const wrap = sec.appendChild(document.createElement('div'));
+    wrap.style.overflowX = 'auto';
+    const table = wrap.appendChild(document.createElement('table'));
+    const head = table.createTHead().insertRow();
+    t.columns.forEach(c => { head.appendChild(document.createElement('th')).textContent = c; });
+    const body = table.createTBody();
+    const pager = sec.appendChild(document.createElement('div'));
+    pager.className = 'pager';
+    const prev = pager.appendChild(document.createElement('button'));
+    const label = pager.appendChild(document.createElement('span'));
+    const next = pager.appendChild(document.createElement('button'));
+    prev.textContent = '‹ Newer';
+    next.textContent = 'Older ›';
+
+    const total = t.shards.reduce((n, s) => n + s.rows, 0);
+    const pages = Math.max(1, Math.ceil(total / pageRows));
+    pager.hidden = pages === 1;
+    const rows = [];
+    let loaded = 0, page = 0;
+    async function show(p) {
+        prev.disabled = next.disabled = true;
+        // Shards are newest first: fetch only as many as this page reaches into
+        while (rows.length < (p + 1) * pageRows && loaded < t.shards.length) {
+            const s = t.shards[loaded];
+            rows.push(...(await fetchJSON('data/' + s.file + '?v=' + s.v)).rows);
+            loaded++;
+        }
+        page = p;
+        body.textContent = '';
+        for (const r of rows.slice(p * pageRows, (p + 1) * pageRows)) {
+            const tr = body.insertRow();
+            r.forEach(v => { tr.insertCell().textContent = v; });
+        }
+        label.textContent = `Page ${p + 1} of ${pages}`;
+        prev.disabled = p === 0;
+        next.disabled = p >= pages - 1;
+    }
+    prev.onclick = () => show(page - 1);
+    next.onclick = () => show(page + 1);
+    show(0).catch(() => { label.textContent = 'Could not load rows.'; });
+    return sec;
 }
 window.onload = function() { showTab('summary'); };
 """
@@ -82,131 +166,238 @@ window.onload = function() { showTab('summary'); };
 
 # ── helpers ──────────────────────────────────────────────────────────────────
 
-def _post_slack(channel, text):
-    if not SLACK_TOKEN or not channel:
-        return
-    r = requests.post(
-        "https://slack.com/api/chat.postMessage",
-        headers={"Authorization": f"Bearer {SLACK_TOKEN}", "Content-Type": "application/json"},
-        json={"channel": channel, "text": text},
-    )
-    status = "ok" if r.ok and r.json().get("ok") else f"failed {r.status_code}"
-    print(f"  Slack → {status}")
-
-
 def _td(val, fmt=None):
     if val is None or val == "":
         return "<td>—</td>"
     return f"<td>{fmt % val if fmt else val}</td>"
 
 
-# ── data loading ──────────────────────────────────────────────────────────────
+def _td_col(values, fmt=None):
+    """Pre-format one table column as a list of <td> cells."""
+    return [_td(v, fmt) for v in values]
 
-def _load_flume(today):
-    rows = []
-    if not os.path.exists(FLUME_CSV):
-        return rows
-    with open(FLUME_CSV, newline="") as f:
-        for r in csv.DictReader(f):
-            d = datetime.datetime.strptime(r["date"], "%Y-%m-%d").date()
-            ccf = float(r["ccf"])
-            rate = get_rate(r["date"])
-            rows.append({"date": r["date"], "date_obj": d, "ccf": ccf,
-                          "rate": rate, "cost": round(ccf * rate, 2)})
-    return rows
 
+def _tbody(*columns):
+    """Yield newline-separated <tr> rows zipped from pre-formatted <td> columns."""
+    sep = ""
+    for cells in zip(*columns):
+        yield f"{sep}<tr>{''.join(cells)}</tr>"
+        sep = "\n"
 
-def _load_leslies(cutoff):
+
+# ── data loading ──────────────────────────────────────────────────────────────
+
+def _load_flume():
+    """Daily usage rows with rate and cost, oldest first."""
+    if not os.path.exists(FLUME_CSV):
+        return []
+    cols = log_cache.load("flume")
+    ok = ~np.isnat(cols["date"])
+    dates, ccf = cols["date"][ok], cols["ccf"][ok]
+    order = np.argsort(dates, kind="stable")
+    dates, ccf = dates[order], ccf[order]
+    rates = season_index().rates(dates)
+    if np.isnan(rates).any():
+        year = str(dates[np.isnan(rates)][0])[:4]
+        raise ValueError(f"No season configured for year {year}")
+    costs = np.round(ccf * rates, 2)
+    return [{"date": d.isoformat(), "date_obj": d, "ccf": c, "rate": r, "cost": cost}
+            for d, c, r, cost in zip(dates.tolist(), ccf.tolist(), rates.tolist(), costs.tolist())]
+
+
+def _load_leslies():
+    """Tests sorted by test date (oldest first), with values formatted back to display strings."""
     rows = []
     if not os.path.exists(LESLIES_CSV):
         return rows
-    with open(LESLIES_CSV, newline="") as f:
-        for r in csv.DictReader(f):
-            try:
-                d = datetime.datetime.strptime(r["test_date"], "%m/%d/%Y").date()
-            except ValueError:
-                continue
-            if d >= cutoff:
-                rows.append(r | {"date_obj": d})
-    return rows
-
-
-def _load_flow(cutoff_dt=None):
+    cols = log_cache.load("leslies")
+    dates = cols["test_date"].astype(object)
+    for i, d in enumerate(dates):
+        if d is None:
+            continue
+        row = {"run_timestamp": str(cols["run_timestamp"][i]), "test_date": d.strftime("%m/%d/%Y"),
+               "in_store": str(cols["in_store"][i]), "date_obj": d}
+        for c in log_cache.CHEM_COLS:
+            v = cols[c][i]
+            row[c] = "" if math.isnan(v) else f"{v:g}"
+        rows.append(row)
+    return sorted(rows, key=lambda x: x["date_obj"])
+
+
+def _load_flow():
     """Return list of dicts sorted by read_datetime ascending."""
     rows = []
     if not os.path.exists(FLOW_CSV):
         return rows
-    with open(FLOW_CSV, newline="") as f:
-        for r in csv.DictReader(f):
-            try:
-                dt = datetime.datetime.strptime(r["read_datetime"], "%Y-%m-%d %H:%M:%S")
-            except ValueError:
-                continue
-            if cutoff_dt and dt < cutoff_dt:
-                continue
-            rows.append({
-                "dt":       dt,
-                "flow":     _safe_float(r.get("flow")),
-                "flow_std": _safe_float(r.get("flow_std")),
-                "vac":      _safe_float(r.get("vac_press")),
-                "sys":      _safe_float(r.get("sys_press")),
-                "f1":       _safe_float(r.get("f1_press")),
-            })
+    cols = log_cache.load("flow")
+    values = {k: [_safe_float(v) for v in cols[k].tolist()]
+              for k in ("flow", "flow_std", "vac_press", "sys_press", "f1_press")}
+    for i, dt in enumerate(cols["read_datetime"].astype(object)):
+        if dt is None:
+            continue
+        rows.append({
+            "dt":       dt,
+            "flow":     values["flow"][i],
+            "flow_std": values["flow_std"][i],
+            "vac":      values["vac_press"][i],
+            "sys":      values["sys_press"][i],
+            "f1":       values["f1_press"][i],
+        })
     return sorted(rows, key=lambda x: x["dt"])
 
 
+class SortedRows(Sequence):
+    """Read-only rows sorted by one key, with O(log n) window() views.
+
+    A window shares the parent's storage — it is just a (lo, hi) range — so
+    narrowing never copies rows and never scans the full history.
+    """
+
+    def __init__(self, rows, key):
+        self._rows = tuple(rows)
+        self._keys = [r[key] for r in self._rows]
+        self._lo, self._hi = 0, len(self._rows)
+
+    def window(self, start=None, end=None):
+        """Rows with start <= key <= end; either bound may be None (open-ended)."""
+        lo = self._lo if start is None else bisect_left(self._keys, start, self._lo, self._hi)
+        hi = self._hi if end is None else bisect_right(self._keys, end, lo, self._hi)
+        view = copy.copy(self)
+        view._lo, view._hi = lo, hi
+        return view
+
+    def __len__(self):
+        return self._hi - self._lo
+
+    def __getitem__(self, i):
+        idx = range(self._lo, self._hi)[i]
+        if isinstance(i, slice):
+            return tuple(self._rows[j] for j in idx)
+        return self._rows[idx]
+
+
+@dataclass(frozen=True)
+class DashboardData:
+    """Every log loaded once per build, each sorted oldest first.
+
+    Tabs get these shared views and take their own windows; nothing re-reads a CSV.
+    """
+    flume: SortedRows
+    usage: flume_index.UsageIndex
+    leslies: SortedRows
+    flow: SortedRows
+
+
+def load_data() -> DashboardData:
+    return DashboardData(flume=SortedRows(_load_flume(), "date_obj"),
+                         usage=flume_index.load(),
+                         leslies=SortedRows(_load_leslies(), "date_obj"),
+                         flow=SortedRows(_load_flow(), "dt"))
+
+
 def _safe_float(v):
     try:
-        return float(v)
+        f = float(v)
     except (TypeError, ValueError):
         return None
+    return None if math.isnan(f) else f
 
 
 def _fmt(v, spec):
     return f"{v:{spec}}" if v is not None else "—"
 
 
+_RENDITION_RE = re.compile(r"^(.+)-(\d+)w\.png$")
+
+
+@functools.cache
+def _charts():
+    """{chart stem: {"size": [w, h], "widths": [...], "webp": bool}} for every PNG in docs/.
+
+    Sizes come from the PNG header; widths are the smaller -<w>w renditions
+    update_plots.py wrote alongside it.
+    """
+    names = set(os.listdir(DOCS)) if os.path.isdir(DOCS) else set()
+    charts = {}
+    for name in sorted(names):
+        if not name.endswith(".png") or _RENDITION_RE.match(name):
+            continue
+        with open(os.path.join(DOCS, name), "rb") as f:
+            head = f.read(24)
+        if head[:8] != b"\x89PNG\r\n\x1a\n":
+            continue
+        stem = name[:-4]
+        charts[stem] = {"size": list(struct.unpack(">II", head[16:24])),
+                        "widths": sorted(int(m.group(2)) for m in map(_RENDITION_RE.match, names)
+                                         if m and m.group(1) == stem),
+                        "webp": f"{stem}.webp" in names}
+    return charts
+
+
+def _img(stem, alt, lazy=True):
+    """<picture> for chart *stem*: WebP and PNG srcsets over every rendition, lazily loaded unless *lazy* is False."""
+    chart = _charts().get(stem)
+    attrs = f'alt="{alt}"' + (' loading="lazy"' if lazy else "")
+    if chart is None:
+        return f'<img src="{stem}.png" {attrs}>'
+    width, height = chart["size"]
+    sizes = f'sizes="(max-width: {width}px) 100vw, {width}px"'
+
+    def srcset(ext):
+        return ", ".join([f"{stem}-{w}w.{ext} {w}w" for w in chart["widths"]] + [f"{stem}.{ext} {width}w"])
+
+    webp = f'<source type="image/webp" srcset="{srcset("webp")}" {sizes}>' if chart["webp"] else ""
+    return (f'<picture>{webp}<img src="{stem}.png" srcset="{srcset("png")}" {sizes} '
+            f'width="{width}" height="{height}" {attrs}></picture>')
+
+
 # ── section builders ──────────────────────────────────────────────────────────
+# Each builder is a generator of HTML chunks, streamed straight into index.html.
 
 def _summary_tab(current_season=None):
     chem_notice = "" if current_season else (
         '<p class="note">Pool is closed — chemical plots reflect last season\'s data.</p>'
     )
-    return f"""
+    yield f"""
 <h3>Flow – Last 7 Days</h3>
-<img src="flow_7d.png" alt="7-day flow rate">
+{_img("flow_7d", "7-day flow rate", lazy=False)}
 <h3>Season Water Use Comparison</h3>
-<img src="flume_season_comparison.png" alt="Season comparison">
+{_img("flume_season_comparison", "Season comparison")}
 <h3>pH</h3>
-{chem_notice}<img src="ph.png" alt="pH">
+{chem_notice}{_img("ph", "pH")}
 <h3>Chlorine</h3>
-<img src="chlorine.png" alt="Chlorine">
+{_img("chlorine", "Chlorine")}
 """
 
 
-def _water_tab(all_flume, today):
-    recent = [r for r in all_flume if 0 <= (today - r["date_obj"]).days < 30]
-    table_rows = "\n".join(
-        f"<tr><td>{r['date']}</td><td>{r['ccf']:.3f}</td><td>${r['cost']:.2f}</td></tr>"
-        for r in reversed(recent)
-    )
-    usage_table = f"""
+def _water_tab(all_flume, usage, today):
+    recent_start = today - datetime.timedelta(days=29)
+    recent = all_flume.window(recent_start, today)[::-1]
+    yield f"""
+<h3>Daily Usage – Last 30 Days</h3>
+{_img("flume_usage_chart", "30-day usage chart")}
+<h3>Season Comparison (14-Day Rolling Average)</h3>
+{_img("flume_season_comparison", "Season comparison chart")}
+
 <h3>Last 30 Days of Use</h3>
 <table>
   <thead><tr><th>Date</th><th>Usage (CCF)</th><th>Cost ($)</th></tr></thead>
-  <tbody>{table_rows}</tbody>
-</table>"""
+  <tbody>"""
+    yield from _tbody([f"<td>{r['date']}</td>" for r in recent],
+                      [f"<td>{r['ccf']:.3f}</td>" for r in recent],
+                      [f"<td>${r['cost']:.2f}</td>" for r in recent])
+    yield "</tbody>\n</table>\n"
 
-    projection = ""
     current = get_current_season(today)
     if current:
-        season_rows = [r for r in all_flume if current.open <= r["date_obj"] <= today]
-        used_ccf    = sum(r["ccf"] for r in season_rows)
-        cost_so_far = used_ccf * current.rate
+        season      = usage.usage_between(current.open, today)
+        used_ccf    = season.ccf
+        cost_so_far = season.cost
         days_left   = max((current.close - today).days + 1, 0)
-        recent_avg  = (sum(r["ccf"] for r in recent) / len(recent)) if recent else 0.0
+        last_30     = usage.usage_between(recent_start, today)
+        recent_avg  = (last_30.ccf / last_30.days) if last_30.days else 0.0
         proj_cost   = recent_avg * days_left * current.rate
-        projection  = f"""
+        yield f"""
 <h3>Season Usage Summary</h3>
 <ul>
   <li><strong>Cost so far:</strong> ${cost_so_far:,.2f}
@@ -215,13 +406,7 @@ def _water_tab(all_flume, today):
       ({recent_avg:.2f} CCF/day × {days_left} days remaining)</li>
 </ul>"""
 
-    return f"""
-<h3>Daily Usage – Last 30 Days</h3>
-<img src="flume_usage_chart.png" alt="30-day usage chart">
-<h3>Season Comparison (14-Day Rolling Average)</h3>
-<img src="flume_season_comparison.png" alt="Season comparison chart">
-{usage_table}
-{projection}
+    yield f"""
 <p class="updated">Dashboard updated {today.isoformat()}</p>
 """
 
@@ -231,33 +416,45 @@ def _chemicals_tab(current_season=None):
         '<div class="notice">Pool is closed for the season — chemical testing will resume when the pool opens. '
         'Plots below reflect last season\'s data.</div>'
     )
-    return f"""
+    yield f"""
 <h3>Chemical History</h3>
 {off_banner}<p class="note">Green band = Leslie's recommended range. Yellow = caution. Red = state closure limit.</p>
 <p class="note">Leslie's tests are not state-certified and are run off-hours.
    Out-of-limit readings may not reflect real pool conditions.</p>
-<img src="ph.png"           alt="pH">
-<img src="chlorine.png"     alt="Chlorine">
-<img src="alkalinity.png"   alt="Alkalinity">
-<img src="cyanuric_acid.png" alt="Cyanuric Acid">
-<img src="phosphates.png"   alt="Phosphates">
-<img src="calcium.png"      alt="Calcium">
-<img src="copper.png"       alt="Copper">
-<img src="iron.png"         alt="Iron">
+{_img("ph", "pH")}
+{_img("chlorine", "Chlorine")}
+{_img("alkalinity", "Alkalinity")}
+{_img("cyanuric_acid", "Cyanuric Acid")}
+{_img("phosphates", "Phosphates")}
+{_img("calcium", "Calcium")}
+{_img("copper", "Copper")}
+{_img("iron", "Iron")}
 """
 
 
-def _pumphouse_tab(now_ct, current_season=None):
-    all_flow = _load_flow()
+def _flow_columns(rows, time_fmt):
+    """Pre-formatted <td> columns for a flow/pressure table."""
+    return (
+        [f"<td>{r['dt'].strftime(time_fmt)}</td>" for r in rows],
+        _td_col((r["flow"] for r in rows), "%.2f"),
+        _td_col((r["flow_std"] for r in rows), "%.2f"),
+        _td_col((r["vac"] for r in rows), "%.1f"),
+        _td_col((r["sys"] for r in rows), "%.1f"),
+        _td_col((r["f1"] for r in rows), "%.1f"),
+    )
+
 
+def _pumphouse_tab(all_flow, now_ct, current_season=None):
     if not all_flow:
         if not current_season:
-            return (
+            yield (
                 '<div class="status off">RPi offline — pool closed for the season</div>'
                 '<p class="note">Water flow is still monitored via Flume for leak detection.</p>'
                 "<p>No flow data on file from the previous season.</p>"
             )
-        return "<p>No flow data available.</p>"
+        else:
+            yield "<p>No flow data available.</p>"
+        return
 
     last = all_flow[-1]
     age_h = (now_ct.replace(tzinfo=None) - last["dt"]).total_seconds() / 3600
@@ -284,48 +481,48 @@ def _pumphouse_tab(now_ct, current_season=None):
             status_cls = "err"
         status_html = f'<div class="status {status_cls}">RPi last seen: {age_str}</div>'
 
-    # 24-h average flow
+    # 24-h average flow — raw readings, exact to the second: compaction keeps at least 31 days
+    # of them, and the window is a bisect into rows already in memory
     cutoff_24h = now_ct.replace(tzinfo=None) - datetime.timedelta(hours=24)
-    recent_24h = [r for r in all_flow if r["dt"] >= cutoff_24h and r["flow"] is not None]
+    recent_24h = [r for r in all_flow.window(cutoff_24h) if r["flow"] is not None]
     avg_flow = (sum(r["flow"] for r in recent_24h) / len(recent_24h)) if recent_24h else None
 
-    stats_html = f"""
+    # Recent readings table (last N rows, newest first)
+    table_rows = all_flow[-FLOW_TABLE_ROWS:][::-1]
+
+    yield f"""
+{status_html}
+
 <div class="stats">
   <div class="stat"><div class="stat-label">Flow (gpm)</div>
     <div class="stat-val">{_fmt(last['flow'], '.1f')}</div></div>
   <div class="stat"><div class="stat-label">24h Avg Flow</div>
     <div class="stat-val">{_fmt(avg_flow, '.1f')}</div></div>
-</div>"""
-
-    # Recent readings table (last N rows, newest first)
-    table_rows_data = all_flow[-FLOW_TABLE_ROWS:][::-1]
-    table_rows_html = "\n".join(
-        f"<tr><td>{r['dt'].strftime('%m/%d %H:%M')}</td>"
-        f"{_td(r['flow'], '%.2f')}{_td(r['flow_std'], '%.2f')}"
-        f"{_td(r['vac'], '%.1f')}"
-        f"{_td(r['sys'], '%.1f')}{_td(r['f1'], '%.1f')}</tr>"
-        for r in table_rows_data
-    )
-
-    return f"""
-{status_html}
-{stats_html}
+</div>
 <h3>Flow – Last 7 Days</h3>
-<img src="flow_7d.png" alt="7-day flow rate">
+{_img("flow_7d", "7-day flow rate")}
 <h3>Flow – Last 30 Days</h3>
-<img src="flow_30d.png" alt="30-day flow rate">
+{_img("flow_30d", "30-day flow rate")}
 <h3>Pressures and Flow – Last 30 Days</h3>
-<img src="press.png" alt="Pressure and flow">
-<h3>Recent Readings (last {len(table_rows_data)} entries)</h3>
+{_img("press", "Pressure and flow")}
+<h3>Recent Readings (last {len(table_rows)} entries)</h3>
 <table>
   <thead><tr><th>Time (CT)</th><th>Flow (gpm)</th><th>σ (gpm)</th><th>Vac (psi)</th>
              <th>Sys (psi)</th><th>F1 (psi)</th></tr></thead>
-  <tbody>{table_rows_html}</tbody>
-</table>
-"""
+  <tbody>"""
+    yield from _tbody(*_flow_columns(table_rows, "%m/%d %H:%M"))
+    yield "</tbody>\n</table>\n"
+
 
+RAW_LESLIES_COLS = [
+    "run_timestamp", "test_date",
+    "free_chlorine", "total_chlorine", "ph", "alkalinity", "calcium",
+    "cyanuric_acid", "iron", "copper", "phosphates", "salt", "in_store",
+]
 
-def _raw_tab(today):
+
+def _raw_tables(data, today, flow_cutoff):
+    """Yield (name, title, headers, newest-first rows, row -> month, row -> cells) per Raw-tab table."""
     current = get_current_season(today)
     if current:
         season_start = current.open
@@ -334,100 +531,164 @@ def _raw_tab(today):
         season_start = today - datetime.timedelta(days=90)
         season_label = "last 90 days (no active season)"
 
-    sections = []
-
-    # --- Water usage (current season, newest first) ---
-    flume_rows = []
-    if os.path.exists(FLUME_CSV):
-        with open(FLUME_CSV, newline="") as f:
-            for r in csv.DictReader(f):
-                d = datetime.datetime.strptime(r["date"], "%Y-%m-%d").date()
-                if d >= season_start:
-                    ccf = float(r["ccf"])
-                    rate = get_rate(r["date"])
-                    flume_rows.append((r["date"], ccf, ccf * rate))
-    flume_rows.sort(reverse=True)
-    flume_html = "\n".join(
-        f"<tr><td>{d}</td><td>{ccf:.3f}</td><td>${cost:.2f}</td></tr>"
-        for d, ccf, cost in flume_rows
-    )
-    sections.append(f"""
-<h3>Water Usage — {season_label} ({len(flume_rows)} days)</h3>
-<table>
-  <thead><tr><th>Date</th><th>Usage (CCF)</th><th>Cost ($)</th></tr></thead>
-  <tbody>{flume_html}</tbody>
-</table>""")
+    # --- Water usage (current season) ---
+    flume_rows = data.flume.window(season_start)[::-1]
+    yield ("water", f"Water Usage — {season_label} ({len(flume_rows)} days)",
+           ["Date", "Usage (CCF)", "Cost ($)"], flume_rows,
+           lambda r: r["date_obj"].strftime("%Y-%m"),
+           lambda r: [r["date"], f"{r['ccf']:.3f}", f"${r['ccf'] * r['rate']:.2f}"])
+
+    # --- Leslie's tests (current season) ---
+    les_rows = data.leslies.window(season_start)[::-1]
+    yield ("leslies", f"Water Chemistry (Leslie's) — {season_label} ({len(les_rows)} tests)",
+           ["Run Timestamp", "Test Date", "Free Cl", "Total Cl", "pH", "Alk", "Ca",
+            "CYA", "Fe", "Cu", "Phos", "Salt", "In-Store"], les_rows,
+           lambda r: r["date_obj"].strftime("%Y-%m"),
+           lambda r: [r.get(c, "") for c in RAW_LESLIES_COLS])
+
+    # --- Flow/pressure (last 7 days) ---
+    flow_rows = data.flow.window(flow_cutoff)[::-1]
+    yield ("flow", f"Pump House / Flow — last 7 days ({len(flow_rows)} readings)",
+           ["Timestamp (CT)", "Flow (gpm)", "σ (gpm)",
+            "Vac Press (psi)", "Sys Press (psi)", "F1 Press (psi)"], flow_rows,
+           lambda r: r["dt"].strftime("%Y-%m"),
+           lambda r: [r["dt"].strftime("%Y-%m-%d %H:%M:%S"), _fmt(r["flow"], ".2f"),
+                      _fmt(r["flow_std"], ".2f"), _fmt(r["vac"], ".1f"),
+                      _fmt(r["sys"], ".1f"), _fmt(r["f1"], ".1f")])
+
+
+def _write_if_changed(path, text):
+    """Atomically write *text* to *path* unless it already holds exactly that. Returns True if written."""
+    try:
+        with open(path, encoding="utf-8") as f:
+            if f.read() == text:
+                return False
+    except OSError:
+        pass
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(text)
+    os.replace(tmp, path)
+    return True
+
+
+def _write_raw_shards(data, today, flow_cutoff):
+    """Write the Raw-tab tables as per-table, per-month JSON shards plus docs/data/manifest.json.
+
+    Shards are newest first. Unchanged shards are left untouched and shards no
+    longer listed are removed, so past months don't churn in git.
+    """
+    os.makedirs(RAW_DATA_DIR, exist_ok=True)
+    manifest, keep, written = {"page_rows": RAW_PAGE_ROWS, "tables": []}, {"manifest.json"}, 0
+    for name, title, headers, rows, month_of, cells_of in _raw_tables(data, today, flow_cutoff):
+        shards = []
+        for month, group in groupby(rows, key=month_of):
+            cells = [cells_of(r) for r in group]
+            text = json.dumps({"rows": cells}, ensure_ascii=False, separators=(",", ":"))
+            fname = f"{name}-{month}.json"
+            written += _write_if_changed(os.path.join(RAW_DATA_DIR, fname), text)
+            keep.add(fname)
+            shards.append({"file": fname, "month": month, "rows": len(cells),
+                           "v": hashlib.sha256(text.encode()).hexdigest()[:12]})
+        manifest["tables"].append({"name": name, "title": title, "columns": headers, "shards": shards})
+    _write_if_changed(os.path.join(RAW_DATA_DIR, "manifest.json"),
+                      json.dumps(manifest, ensure_ascii=False, indent=1) + "\n")
+    for fname in os.listdir(RAW_DATA_DIR):
+        if fname not in keep:
+            os.remove(os.path.join(RAW_DATA_DIR, fname))
+    print(f"✅ Raw-tab data: {sum(len(t['shards']) for t in manifest['tables'])} shard(s), {written} rewritten")
+
+
+def _raw_tab(data, today, flow_cutoff):
+    _write_raw_shards(data, today, flow_cutoff)
+    # Filled in by loadRaw() from docs/data/ the first time the tab is opened
+    yield """
+<div id="raw-tables"><p class="note">Loading raw data…</p></div>
+"""
 
-    # --- Leslie's tests (current season, newest first) ---
-    CHEM_COLS = [
-        "free_chlorine", "total_chlorine", "ph", "alkalinity", "calcium",
-        "cyanuric_acid", "iron", "copper", "phosphates", "salt", "in_store",
-    ]
-    les_rows = []
-    if os.path.exists(LESLIES_CSV):
-        with open(LESLIES_CSV, newline="") as f:
-            for r in csv.DictReader(f):
-                try:
-                    d = datetime.datetime.strptime(r["test_date"], "%m/%d/%Y").date()
-                except ValueError:
-                    continue
-                if d >= season_start:
-                    les_rows.append(r)
-    les_html = "\n".join(
-        "<tr>"
-        f"<td>{r.get('run_timestamp','')}</td><td>{r.get('test_date','')}</td>"
-        + "".join(f"<td>{r.get(c, '')}</td>" for c in CHEM_COLS)
-        + "</tr>"
-        for r in reversed(les_rows)
-    )
-    sections.append(f"""
-<h3>Water Chemistry (Leslie's) — {season_label} ({len(les_rows)} tests)</h3>
-<div style="overflow-x:auto">
-<table>
-  <thead>
-    <tr><th>Run Timestamp</th><th>Test Date</th>
-        <th>Free Cl</th><th>Total Cl</th><th>pH</th><th>Alk</th><th>Ca</th>
-        <th>CYA</th><th>Fe</th><th>Cu</th><th>Phos</th><th>Salt</th><th>In-Store</th></tr>
-  </thead>
-  <tbody>{les_html}</tbody>
-</table>
-</div>""")
-
-    # --- Flow/pressure (last 7 days, newest first) ---
-    flow_cutoff = datetime.datetime.now() - datetime.timedelta(days=7)
-    flow_rows = _load_flow(cutoff_dt=flow_cutoff)
-    flow_html = "\n".join(
-        f"<tr><td>{r['dt'].strftime('%Y-%m-%d %H:%M:%S')}</td>"
-        f"{_td(r['flow'], '%.2f')}{_td(r['flow_std'], '%.2f')}"
-        f"{_td(r['vac'], '%.1f')}"
-        f"{_td(r['sys'], '%.1f')}{_td(r['f1'], '%.1f')}</tr>"
-        for r in reversed(flow_rows)
-    )
-    sections.append(f"""
-<h3>Pump House / Flow — last 7 days ({len(flow_rows)} readings)</h3>
-<table>
-  <thead>
-    <tr><th>Timestamp (CT)</th><th>Flow (gpm)</th><th>σ (gpm)</th>
-        <th>Vac Press (psi)</th><th>Sys Press (psi)</th><th>F1 Press (psi)</th></tr>
-  </thead>
-  <tbody>{flow_html}</tbody>
-</table>""")
 
-    return "\n".join(sections)
+# ── fragment cache ────────────────────────────────────────────────────────────
+# Each tab declares what its HTML depends on; a tab whose inputs hash the same as
+# last build is copied from logs/.cache/fragments/ instead of being rebuilt.
 
+def _file_digest(path):
+    if not os.path.exists(path):
+        return None
+    with open(path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
 
-# ── main ──────────────────────────────────────────────────────────────────────
 
-def main():
-    os.makedirs(DOCS, exist_ok=True)
-    central = pytz.timezone("US/Central")
-    now_ct = datetime.datetime.now(pytz.utc).astimezone(central)
-    today = now_ct.date()
+def _season_key(season):
+    return [season.year, season.open.isoformat(), season.close.isoformat(), season.rate] if season else None
+
+
+def _tabs(data, now_ct, today, current_season):
+    """(name, declared inputs, fragment builder, files the fragment relies on) for each tab, in page order."""
+    season = _season_key(current_season)
+    seasons_txt = _file_digest(flume_index.SEASONS_FILE)
+    flume_csv = log_cache.source_sha256("flume")
+    flow_csv = log_cache.source_sha256("flow")
+    flow_cutoff = datetime.datetime.now() - datetime.timedelta(days=7)
+    flow_window = data.flow.window(flow_cutoff)
+    charts = _charts()  # chart tabs' <picture> markup depends on which renditions exist
+    return [
+        ("summary", {"season": season, "charts": charts},
+         lambda: _summary_tab(current_season), ()),
+        ("water", {"season": season, "today": today, "flume": flume_csv, "seasons": seasons_txt,
+                   "charts": charts},
+         lambda: _water_tab(data.flume, data.usage, today), ()),
+        ("chemicals", {"season": season, "charts": charts},
+         lambda: _chemicals_tab(current_season), ()),
+        # Shows "N min ago", so the clock is an input to the minute
+        ("pumphouse", {"season": season, "now": now_ct.strftime("%Y-%m-%d %H:%M"), "flow": flow_csv,
+                       "charts": charts},
+         lambda: _pumphouse_tab(data.flow, now_ct, current_season), ()),
+        ("raw", {"season": season, "today": today, "flume": flume_csv, "seasons": seasons_txt,
+                 "leslies": log_cache.source_sha256("leslies"), "flow": flow_csv,
+                 "flow_window": [flow_window[0]["dt"] if flow_window else None, len(flow_window)]},
+         lambda: _raw_tab(data, today, flow_cutoff), (os.path.join(RAW_DATA_DIR, "manifest.json"),)),
+    ]
 
-    all_flume = _load_flume(today)
-    current_season = get_current_season(today)
 
-    html = f"""<!DOCTYPE html>
+def _cached_fragment(name, inputs, build, outputs, code_digest):
+    """Yield tab *name*'s HTML from the fragment cache, or from *build* (saving it) when inputs changed."""
+    os.makedirs(FRAGMENT_DIR, exist_ok=True)
+    html_path = os.path.join(FRAGMENT_DIR, f"{name}.html")
+    key_path = os.path.join(FRAGMENT_DIR, f"{name}.key")
+    key = hashlib.sha256(json.dumps({"code": code_digest, "inputs": inputs},
+                                    sort_keys=True, default=str).encode()).hexdigest()
+    try:
+        with open(key_path) as f:
+            hit = f.read() == key and all(os.path.exists(p) for p in outputs)
+        if hit:
+            with open(html_path, encoding="utf-8") as f:
+                html = f.read()
+            print(f"⏭️  {name} tab unchanged")
+            yield html
+            return
+    except OSError:
+        pass
+
+    tmp = html_path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        for chunk in build():
+            f.write(chunk)
+            yield chunk
+    os.replace(tmp, html_path)
+    # Key is written last — it is what marks the fragment as valid
+    with open(key_path, "w") as f:
+        f.write(key)
+
+
+def _code_digest():
+    """Hash of this file, so any change to a builder invalidates every fragment."""
+    with open(__file__, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def _page(data, now_ct, today, current_season):
+    """Yield the whole dashboard page as a stream of HTML chunks."""
+    yield f"""<!DOCTYPE html>
 <html lang="en">
 <head>
   <meta charset="UTF-8">
@@ -445,25 +706,42 @@ def main():
   <button class="tab-btn" id="btn-pumphouse" onclick="showTab('pumphouse')">Pump</button>
   <button class="tab-btn" id="btn-raw"       onclick="showTab('raw')">Raw</button>
 </div>
-<div id="summary"   class="tab-pane">{_summary_tab(current_season)}</div>
-<div id="water"     class="tab-pane">{_water_tab(all_flume, today)}</div>
-<div id="chemicals" class="tab-pane">{_chemicals_tab(current_season)}</div>
-<div id="pumphouse" class="tab-pane">{_pumphouse_tab(now_ct, current_season)}</div>
-<div id="raw"       class="tab-pane">{_raw_tab(today)}</div>
-</body>
-</html>"""
+"""
+    code_digest = _code_digest()
+    for i, (name, inputs, build, outputs) in enumerate(_tabs(data, now_ct, today, current_season)):
+        if i:
+            yield "</div>\n"
+        pane_id = f'"{name}"'
+        yield f'<div id={pane_id:<11} class="tab-pane">'  # padded to line up like the tab buttons
+        yield from _cached_fragment(name, inputs, build, outputs, code_digest)
+    yield "</div>\n</body>\n</html>"
+
+
+# ── main ──────────────────────────────────────────────────────────────────────
+
+def main():
+    os.makedirs(DOCS, exist_ok=True)
+    now_ct = datetime.datetime.now(datetime.timezone.utc).astimezone(ZoneInfo("US/Central"))
+    today = now_ct.date()
+
+    data = load_data()
+    current_season = get_current_season(today)
 
     out = os.path.join(DOCS, "index.html")
-    with open(out, "w") as f:
-        f.write(html)
+    tmp = out + ".tmp"
+    with open(tmp, "w", buffering=1 << 16) as f:
+        f.writelines(_page(data, now_ct, today, current_season))
+    os.replace(tmp, out)
     print(f"✅ Dashboard written to {out}")
 
     if today.weekday() == 6:  # Sunday only — post to both channels
         # Only notify on the scheduled run, not every workflow_run trigger
         if os.getenv("GITHUB_EVENT_NAME") == "schedule":
+            import http_client  # only needed on the weekly Slack run
+
             msg = "Dashboard updated: https://brianhartsell.github.io/oakspool/"
             for ch in [SLACK_CHANNEL, SLACK_BOARD_CH]:
-                _post_slack(ch, msg)
+                http_client.post_slack(ch, msg)
 
 
 if __name__ == "__main__":
@@ -1,79 +1,295 @@
+import argparse
+import asyncio
 import datetime
+import json
 import os
+import signal
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 from zoneinfo import ZoneInfo
 
-import requests
 from dotenv import load_dotenv
 
-from flume_auth import get_flume_connection
+import http_client
+from flume_client import FlumeAuthError, FlumeClient
 
 load_dotenv()
 
-SLACK_TOKEN = os.getenv("SLACK_BOT_TOKEN")
 SLACK_CHANNEL = os.getenv("SLACK_CHANNEL")
 HEARTBEAT_CHANNEL = os.getenv("SLACK_HEARTBEAT_CHANNEL")
 CCF_CONVERSION = 748.05
 
+# Minute readings from the last WINDOW_MINUTES, with running counters, carried between runs
+# so each run only fetches what arrived since the watermark (its newest minute), plus a short
+# correction window before it for minutes Flume fills in late
+STATE_FILE = os.getenv("FLOW_STATE", "logs/.cache/flow_state.json")
+WINDOW_MINUTES = 240
+CORRECTION_MINUTES = 30
+FLUME_FMT = "%Y-%m-%d %H:%M:%S"
 
-def _post(channel, text):
-    if not SLACK_TOKEN or not channel:
-        return
-    requests.post(
-        "https://slack.com/api/chat.postMessage",
-        headers={"Authorization": f"Bearer {SLACK_TOKEN}", "Content-Type": "application/json"},
-        json={
-            "channel": channel,
-            "text": text,
-            "blocks": [{"type": "section", "text": {"type": "mrkdwn", "text": text}}],
-        },
-    )
+# --daemon: poll Flume from a resident process (Pi / small VM) instead of the Actions cron
+CHECK_INTERVAL = float(os.getenv("FLOW_CHECK_INTERVAL", 5))  # minutes
+ALERT_REPEAT_MINUTES = 30   # re-announce a standing leak at the old cron cadence, not every check
+FAILURES_BEFORE_ALERT = 3   # consecutive failed checks before Slack hears leak detection is offline
+HEALTH_HOST = "127.0.0.1"
+HEALTH_PORT = int(os.getenv("FLOW_HEALTH_PORT", 8787))
 
 
-def main():
+async def _fetch(flume, since_min, since_hour, until):
+    """New MIN and HR readings since the watermark, queried concurrently."""
+    return await flume.query_many({
+        "min_check":  ("MIN", since_min,  until),
+        "hour_check": ("HR",  since_hour, until),
+    })
+
+
+def _ccf(reading):
+    return round(reading.value / CCF_CONVERSION, 4)
+
+
+def _fresh_state():
+    return {"window": WINDOW_MINUTES, "watermark": None, "minutes": deque(), "nonzero": 0, "run": 0, "hours": {}}
+
+
+def _usable(state, window_start):
+    # A gap longer than the window means nothing in the ring is still relevant
+    return state.get("window") == WINDOW_MINUTES and (state.get("watermark") or "") >= window_start
+
+
+def _load_state(window_start):
+    """The saved detector state, or a fresh one when missing or too old to extend."""
+    try:
+        with open(STATE_FILE) as f:
+            state = json.load(f)
+    except (OSError, ValueError):
+        return _fresh_state()
+    if not _usable(state, window_start):
+        return _fresh_state()
+    state["minutes"] = deque(tuple(m) for m in state["minutes"])
+    return state
+
+
+def _save_state(state):
+    os.makedirs(os.path.dirname(STATE_FILE) or ".", exist_ok=True)
+    tmp = STATE_FILE + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump({**state, "minutes": list(state["minutes"])}, f)
+    os.replace(tmp, STATE_FILE)
+
+
+def _tail_run(ring):
+    """Length of the nonzero run at the end of the ring."""
+    run = 0
+    for _, v in reversed(ring):
+        if v == 0:
+            break
+        run += 1
+    return run
+
+
+def _ingest(state, minutes, hours, since, window_start):
+    """Fold readings from *since* onward into the ring and its counters, then evict minutes older than the window.
+
+    Minutes from *since* up to the watermark are a re-fetched correction
+    window: Flume can report a minute as 0 before the bridge syncs and fill it
+    in later, so the ring's copies are dropped and replaced. The counters are
+    adjusted as minutes enter and leave — O(new + corrected + evicted) —
+    except that a correction which breaks the current run rescans it.
+    """
+    ring = state["minutes"]
+    watermark = state["watermark"]
+    popped = 0
+    while ring and ring[-1][0] >= since:
+        _, v = ring.pop()
+        state["nonzero"] -= v != 0
+        popped += 1
+    state["run"] = state["run"] - popped if state["run"] > popped else _tail_run(ring)
+
+    new = 0
+    for r in minutes:
+        if r.datetime < since or (ring and r.datetime <= ring[-1][0]):
+            continue
+        v = _ccf(r)
+        ring.append((r.datetime, v))
+        state["nonzero"] += v != 0
+        state["run"] = state["run"] + 1 if v != 0 else 0
+        new += not watermark or r.datetime > watermark
+    if ring:
+        state["watermark"] = ring[-1][0]
+    while ring and ring[0][0] < window_start:
+        _, v = ring.popleft()
+        state["nonzero"] -= v != 0
+    state["run"] = min(state["run"], len(ring))
+
+    # The latest hour is partial, so it is re-fetched and overwritten each run
+    hour_start = window_start[:13] + ":00:00"
+    state["hours"].update((r.datetime, _ccf(r)) for r in hours)
+    state["hours"] = {h: v for h, v in state["hours"].items() if h >= hour_start}
+    return new
+
+
+async def _check(flume, state=None):
+    """Run one check and return (state, stats). *state* is the in-memory state from the last check, if any."""
     local_tz = ZoneInfo("America/Chicago")
-    now = datetime.datetime.now(local_tz)
-    since_dt = now - datetime.timedelta(hours=4)
+    now = datetime.datetime.now(local_tz).replace(tzinfo=None)
+    window_start = (now - datetime.timedelta(minutes=WINDOW_MINUTES)).strftime(FLUME_FMT)
+    if state is None or not _usable(state, window_start):
+        state = _load_state(window_start)
+
+    since_dt = now - datetime.timedelta(minutes=WINDOW_MINUTES)
+    if state["watermark"]:
+        # Re-fetch the last CORRECTION_MINUTES before the watermark along with everything after it
+        watermark = datetime.datetime.strptime(state["watermark"], FLUME_FMT)
+        since_dt = max(since_dt, watermark - datetime.timedelta(minutes=CORRECTION_MINUTES - 1))
     since = since_dt.strftime("%Y-%m-%dT%H:%M:%S")
     until = now.strftime("%Y-%m-%dT%H:%M:%S")
-    print(f"Checking: {since} → {until}")
-
-    headers, query_url = get_flume_connection()
-
-    resp = requests.post(
-        query_url,
-        headers=headers,
-        json={
-            "queries": [
-                {"request_id": "min_check", "bucket": "MIN", "since_datetime": since, "until_datetime": until},
-                {"request_id": "hour_check", "bucket": "HR",  "since_datetime": since, "until_datetime": until},
-            ]
-        },
-    ).json()
-
-    results = {}
-    for entry in resp.get("data", []):
-        for key in entry:
-            if key not in ("request_id", "success", "code", "message"):
-                results[key] = entry[key]
-
-    minute_values = [round(e["value"] / CCF_CONVERSION, 4) for e in results.get("min_check", [])]
-    hour_values   = [round(e["value"] / CCF_CONVERSION, 4) for e in results.get("hour_check", [])]
-    hour_total    = sum(hour_values)
-
-    total_minutes = len(minute_values)
-    zero_count    = sum(v == 0 for v in minute_values)
-    nonzero_pct   = 100 * (1 - zero_count / total_minutes) if total_minutes else 0
-
-    print(f"Readings: {total_minutes} min, {zero_count} zero, {nonzero_pct:.1f}% non-zero")
-
-    if nonzero_pct >= 95:
-        _post(SLACK_CHANNEL,
-              f"🚰 *Water flow alert: 4 hours continuous*\nTotal use: `{hour_total:.2f} CCF`")
-    elif hour_total > 0 and not minute_values:
-        _post(HEARTBEAT_CHANNEL,
-              f"🕵️ *Discrepancy: hourly > 0 but no minute-level data*\nHourly: `{hour_total:.2f} CCF`")
+    print(f"Checking: {since} → {until}" + ("" if state["watermark"] else " (cold start)"))
+
+    results = await _fetch(flume, since, since_dt.strftime("%Y-%m-%dT%H:00:00"), until)
+    new = _ingest(state, results["min_check"], results["hour_check"], since_dt.strftime(FLUME_FMT), window_start)
+    _save_state(state)
+
+    total_minutes = len(state["minutes"])
+    stats = {
+        "minutes": total_minutes,
+        "hour_total": sum(state["hours"].values()),
+        "nonzero_pct": 100 * state["nonzero"] / total_minutes if total_minutes else 0,
+        "run": state["run"],
+        "watermark": state["watermark"],
+    }
+    print(f"Readings: {total_minutes} min ({new} new), {total_minutes - state['nonzero']} zero, "
+          f"{stats['nonzero_pct']:.1f}% non-zero, current run {state['run']} min")
+    return state, stats
+
+
+def _verdict(stats):
+    """"leak", "discrepancy" or None for quiet water."""
+    if stats["nonzero_pct"] >= 95:
+        return "leak"
+    if stats["hour_total"] > 0 and not stats["minutes"]:
+        return "discrepancy"
+    return None
+
+
+def _post_alert(verdict, stats):
+    """Post the alert for *verdict*. Returns True only if Slack accepted it."""
+    if verdict == "leak":
+        return http_client.post_slack(SLACK_CHANNEL,
+                                      f"🚰 *Water flow alert: 4 hours continuous*\n"
+                                      f"Total use: `{stats['hour_total']:.2f} CCF`",
+                                      blocks=True)
+    if verdict == "discrepancy":
+        return http_client.post_slack(HEARTBEAT_CHANNEL,
+                                      f"🕵️ *Discrepancy: hourly > 0 but no minute-level data*\n"
+                                      f"Hourly: `{stats['hour_total']:.2f} CCF`",
+                                      blocks=True)
+    print("Water quiet — no alert.")
+    return False
+
+
+async def _once():
+    try:
+        async with FlumeClient() as flume:
+            _, stats = await _check(flume)
+    except FlumeAuthError:  # flume_auth already printed why
+        raise SystemExit(1)
+    _post_alert(_verdict(stats), stats)
+
+
+def _serve_health(port, health):
+    """Serve *health* as JSON on 127.0.0.1:*port* from a background thread."""
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path not in ("/", "/healthz"):
+                self.send_error(404)
+                return
+            last_ok = health["last_ok"]
+            fresh = last_ok is not None and time.time() - last_ok <= health["stale_after"]
+            body = json.dumps({"status": "ok" if fresh else "stale", **health}).encode()
+            self.send_response(200 if fresh else 503)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):  # keep the journal to one line per check
+            pass
+
+    server = ThreadingHTTPServer((HEALTH_HOST, port), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    print(f"🩺 Health endpoint on http://{HEALTH_HOST}:{port}/healthz")
+    return server
+
+
+async def _daemon(interval, health_port):
+    """Check every *interval* minutes until SIGINT/SIGTERM, reusing one Flume session and the in-memory state."""
+    loop = asyncio.get_running_loop()
+    stop = asyncio.Event()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+
+    health = {"interval_min": interval, "stale_after": 3 * interval * 60, "checks": 0, "failures": 0,
+              "last_ok": None, "last_error": None, "verdict": None, "stats": None}
+    server = _serve_health(health_port, health) if health_port else None
+    state = None
+    alerted = None  # (verdict, time) of the last alert posted
+
+    print(f"🔁 Checking every {interval} min — Ctrl-C or SIGTERM to stop")
+    flume = FlumeClient()  # connects on the first check, so an auth outage at startup is retried too
+    next_run = loop.time()
+    while not stop.is_set():
+        try:
+            state, stats = await _check(flume, state)
+        except Exception as err:  # keep polling through Flume/network outages
+            health["failures"] += 1
+            health["last_error"] = f"{type(err).__name__}: {err}"
+            print(f"❌ Check failed ({health['failures']} in a row): {health['last_error']}")
+            if health["failures"] == FAILURES_BEFORE_ALERT:
+                http_client.post_slack(SLACK_CHANNEL, f"🚨 *Continuous flow check failing* — leak detection "
+                                                      f"is offline\n`{health['last_error']}`", blocks=True)
+        else:
+            if health["failures"] >= FAILURES_BEFORE_ALERT:
+                http_client.post_slack(HEARTBEAT_CHANNEL, "✅ Continuous flow check recovered")
+            verdict = _verdict(stats)
+            # A standing leak is re-announced every ALERT_REPEAT_MINUTES, not on every check. Only an
+            # alert Slack accepted starts that cooldown; one it refused is retried on the next check.
+            if verdict and alerted and alerted[0] == verdict \
+                    and time.time() - alerted[1] < ALERT_REPEAT_MINUTES * 60:
+                print(f"⏭️  {verdict} alert already sent {(time.time() - alerted[1]) / 60:.0f} min ago")
+            elif _post_alert(verdict, stats):
+                alerted = (verdict, time.time())
+            elif verdict is None:
+                alerted = None
+            health.update(checks=health["checks"] + 1, failures=0, last_ok=time.time(),
+                          verdict=verdict, stats=stats)
+
+        next_run = max(next_run + interval * 60, loop.time())  # skip ticks missed by a slow check
+        try:
+            await asyncio.wait_for(stop.wait(), next_run - loop.time())
+        except asyncio.TimeoutError:
+            pass
+
+    if server:
+        server.shutdown()
+    print("👋 Flow check daemon stopped")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Alert on continuous water flow from Flume minute data")
+    parser.add_argument("--daemon", action="store_true",
+                        help="stay resident and check on an interval instead of once (e.g. under systemd)")
+    parser.add_argument("--interval", type=float, default=CHECK_INTERVAL,
+                        help=f"with --daemon: minutes between checks (default {CHECK_INTERVAL})")
+    parser.add_argument("--health-port", type=int, default=HEALTH_PORT,
+                        help=f"with --daemon: local health endpoint port, 0 to disable (default {HEALTH_PORT})")
+    args = parser.parse_args(argv)
+
+    if args.daemon:
+        asyncio.run(_daemon(args.interval, args.health_port))
     else:
-        print("Water quiet — no alert.")
+        asyncio.run(_once())
 
 
 if __name__ == "__main__":
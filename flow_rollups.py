@@ -0,0 +1,360 @@
+"""Hourly, daily and weekly aggregates of logs/flow.csv.
+
+Each bucket keeps count, min, max, mean and (population) variance per metric,
+so any span of buckets can be merged into exact pooled stats. Each run reads
+flow.csv only from the byte offset saved in state.json and rewrites only each
+level's last bucket onward; the level tails and the new state are journaled
+and applied together, so an interrupted run never double-counts. Raw readings
+older than --compact-days can be folded out of flow.csv once they are rolled up.
+
+Run after new readings land: python flow_rollups.py [--compact-days N]
+"""
+import argparse
+import csv
+import datetime
+import io
+import json
+import math
+import os
+from dataclasses import dataclass
+
+FLOW_CSV   = "logs/flow.csv"
+ROLLUP_DIR = "logs/rollups"
+STATE_FILE = os.path.join(ROLLUP_DIR, "state.json")
+JOURNAL    = os.path.join(ROLLUP_DIR, "update.journal")
+TAIL_BLOCK = 4096
+
+METRICS = ("flow", "flow_std", "vac_press", "sys_press", "f1_press", "combined_press")
+FIELDS  = ("count", "min", "max", "mean", "var")
+TIME_FMT = "%Y-%m-%d %H:%M:%S"
+
+# update_plots.py draws up to 30 days of raw readings — never compact inside that
+MIN_RAW_DAYS = 31
+
+
+def _hour(dt):
+    return dt.replace(minute=0, second=0, microsecond=0)
+
+
+def _day(dt):
+    return dt.replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def _week(dt):
+    return _day(dt) - datetime.timedelta(days=dt.weekday())  # Monday
+
+
+LEVELS = {"hourly": _hour, "daily": _day, "weekly": _week}
+
+
+@dataclass
+class Stat:
+    """Running count/min/max/mean/M2 (Welford), mergeable with Chan's pooled update."""
+    count: int = 0
+    min: float = math.inf
+    max: float = -math.inf
+    mean: float = 0.0
+    m2: float = 0.0
+
+    @property
+    def var(self) -> float:
+        return self.m2 / self.count if self.count else 0.0
+
+    def add(self, v: float) -> None:
+        self.count += 1
+        delta = v - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (v - self.mean)
+        self.min = min(self.min, v)
+        self.max = max(self.max, v)
+
+    def merge(self, other: "Stat") -> None:
+        if not other.count:
+            return
+        n = self.count + other.count
+        delta = other.mean - self.mean
+        self.m2 += other.m2 + delta * delta * self.count * other.count / n
+        self.mean += delta * other.count / n
+        self.count = n
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+
+def rollup_path(level: str) -> str:
+    """The CSV file holding one rollup level."""
+    return os.path.join(ROLLUP_DIR, f"flow_{level}.csv")
+
+
+def _columns():
+    return ["bucket"] + [f"{m}_{f}" for m in METRICS for f in FIELDS]
+
+
+def _parse_row(r):
+    stats = {}
+    for m in METRICS:
+        count = int(r[f"{m}_count"] or 0)
+        if count:
+            stats[m] = Stat(count, float(r[f"{m}_min"]), float(r[f"{m}_max"]),
+                            float(r[f"{m}_mean"]), float(r[f"{m}_var"]) * count)
+    return datetime.datetime.strptime(r["bucket"], TIME_FMT), stats
+
+
+def _format_rows(buckets):
+    """CSV text for *buckets*, oldest first, in the rollup file's row format."""
+    out = io.StringIO()
+    writer = csv.writer(out)
+    for bucket in sorted(buckets):
+        row = [bucket.strftime(TIME_FMT)]
+        for m in METRICS:
+            s = buckets[bucket].get(m)
+            row += [s.count, round(s.min, 6), round(s.max, 6), round(s.mean, 6), round(s.var, 6)] if s \
+                else [0, "", "", "", ""]
+        writer.writerow(row)
+    return out.getvalue()
+
+
+def load(level: str) -> dict[datetime.datetime, dict[str, Stat]]:
+    """Return {bucket_start: {metric: Stat}} for one level, oldest first. Empty if not built yet."""
+    buckets = {}
+    if not os.path.exists(rollup_path(level)):
+        return buckets
+    with open(rollup_path(level), newline="") as f:
+        for r in csv.DictReader(f):
+            bucket, stats = _parse_row(r)
+            buckets[bucket] = stats
+    return buckets
+
+
+def _last_row(level):
+    """(byte offset of the level file's last row, its bucket, its stats), reading only the end of the file.
+
+    (None, None, None) when the file is missing or has no rows.
+    """
+    path = rollup_path(level)
+    if not os.path.exists(path):
+        return None, None, None
+    with open(path, "rb") as f:
+        header = f.readline()
+        size = pos = f.seek(0, os.SEEK_END)
+        buf = b""
+        while pos > len(header):
+            step = min(TAIL_BLOCK, pos - len(header))
+            pos -= step
+            f.seek(pos)
+            buf = f.read(step) + buf
+            start = buf.rfind(b"\n", 0, len(buf) - 1)
+            if start >= 0:
+                break
+        if size <= len(header):
+            return None, None, None
+    start = pos + start + 1 if start >= 0 else len(header)
+    row = dict(zip(_columns(), next(csv.reader([buf[start - pos:].decode()]))))
+    return (start, *_parse_row(row))
+
+
+def _read_state():
+    if not os.path.exists(STATE_FILE):
+        return {}
+    with open(STATE_FILE) as f:
+        return json.load(f)
+
+
+def _write_state(state):
+    os.makedirs(ROLLUP_DIR, exist_ok=True)
+    tmp = STATE_FILE + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump(state, f, indent=2, sort_keys=True)
+        f.write("\n")
+    os.replace(tmp, STATE_FILE)
+
+
+def _apply_journal():
+    """Write every journaled rollup tail and the new state, then drop the journal. Safe to repeat."""
+    with open(JOURNAL) as f:
+        journal = json.load(f)
+    for level, change in journal["levels"].items():
+        path = rollup_path(level)
+        with open(path, "r+b" if os.path.exists(path) else "wb") as f:
+            f.seek(change["offset"])
+            f.write(change["tail"].encode())
+            f.truncate()
+            f.flush()
+            os.fsync(f.fileno())
+    _write_state(journal["state"])
+    os.remove(JOURNAL)
+
+
+def _commit(levels, state):
+    """Apply {level: (offset, tail text)} and *state* as one unit.
+
+    Journaled (fsync + atomic replace) before any file is touched, so a run
+    killed part-way is completed by the next one instead of folding the same
+    readings in twice.
+    """
+    os.makedirs(ROLLUP_DIR, exist_ok=True)
+    tmp = JOURNAL + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump({"levels": {lv: {"offset": off, "tail": tail} for lv, (off, tail) in levels.items()},
+                   "state": state}, f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, JOURNAL)
+    _apply_journal()
+
+
+def _safe_float(v):
+    try:
+        f = float(v)
+    except (TypeError, ValueError):
+        return None
+    return None if math.isnan(f) else f
+
+
+def _resume_point(f, state):
+    """(byte offset to read flow.csv from, watermark to filter by) for open file *f*.
+
+    The saved offset is trusted when the line just before it is still the last
+    line folded — flow.csv is only ever appended to, except by compact(),
+    which moves the offset itself. Otherwise (first run, or the file was
+    rewritten) the whole file is rescanned and only rows newer than the
+    watermark are folded.
+    """
+    header_end = len(f.readline())
+    offset, last_line = state.get("offset"), state.get("last_line")
+    if offset and last_line is not None:
+        line = last_line.encode()
+        if offset - len(line) >= header_end:
+            f.seek(offset - len(line))
+            if f.read(len(line)) == line:
+                return offset, None
+    return header_end, state.get("watermark")
+
+
+def _readings(text, header, after=None):
+    """Yield (dt, {metric: value}) for the flow.csv rows in *text* newer than *after* (a TIME_FMT string)."""
+    for r in csv.DictReader(io.StringIO(text), fieldnames=header):
+        ts = r["read_datetime"]
+        if not ts or after and ts <= after:  # fixed-width timestamps compare as strings
+            continue
+        try:
+            dt = datetime.datetime.strptime(ts, TIME_FMT)
+        except ValueError:
+            continue
+        vals = {m: _safe_float(r.get(m)) for m in METRICS if m != "combined_press"}
+        if vals["vac_press"] is not None and vals["sys_press"] is not None:
+            vals["combined_press"] = vals["vac_press"] + vals["sys_press"]
+        yield dt, vals
+
+
+def update() -> int:
+    """Fold flow.csv rows appended since the last run into every level. Returns rows folded.
+
+    Reads flow.csv from the saved byte offset and rewrites only each level's
+    last bucket onward, so a run costs O(new rows), not O(history).
+    """
+    if os.path.exists(JOURNAL):
+        print("⚠️  Finishing an interrupted rollup update")
+        _apply_journal()
+    if not os.path.exists(FLOW_CSV):
+        return 0
+    state = _read_state()
+    with open(FLOW_CSV, "rb") as f:
+        header = next(csv.reader([f.readline().decode()]))
+        f.seek(0)
+        start, after = _resume_point(f, state)
+        f.seek(start)
+        data = f.read()
+    data = data[:data.rfind(b"\n") + 1]  # a row the Pi is still writing waits for the next run
+    if not data:
+        return 0
+
+    new = list(_readings(data.decode(), header, after))
+    levels = {}
+    for level, bucket_of in LEVELS.items():
+        fresh = {}
+        for dt, vals in new:
+            stats = fresh.setdefault(bucket_of(dt), {})
+            for m, v in vals.items():
+                if v is not None:
+                    stats.setdefault(m, Stat()).add(v)
+        if not fresh:
+            continue
+        offset, last_bucket, last_stats = _last_row(level)
+        if offset is not None and min(fresh) >= last_bucket:
+            # In-order readings only touch the last bucket onward
+            buckets = {last_bucket: last_stats}
+        else:
+            # New file, or a reading older than the last bucket: rewrite the level
+            buckets = load(level)
+            offset = 0
+        for bucket, stats in fresh.items():
+            for m, s in stats.items():
+                buckets.setdefault(bucket, {}).setdefault(m, Stat()).merge(s)
+        tail = _format_rows(buckets)
+        levels[level] = (offset, tail if offset else ",".join(_columns()) + "\r\n" + tail)
+
+    mark = max([dt.strftime(TIME_FMT) for dt, _ in new] + [state.get("watermark") or ""])
+    last_line = data[data.rfind(b"\n", 0, len(data) - 1) + 1:]
+    _commit(levels, {"watermark": mark or None, "offset": start + len(data), "last_line": last_line.decode()})
+    return len(new)
+
+
+def compact(max_age_days: int, now: datetime.datetime | None = None) -> int:
+    """Drop raw flow.csv rows older than *max_age_days* that are already rolled up. Returns rows dropped."""
+    if max_age_days < MIN_RAW_DAYS:
+        raise ValueError(f"--compact-days must be at least {MIN_RAW_DAYS} (raw charts need 30 days)")
+    state = _read_state()
+    watermark = state.get("watermark")
+    if not watermark or not os.path.exists(FLOW_CSV):
+        return 0
+    cutoff = ((now or datetime.datetime.now()) - datetime.timedelta(days=max_age_days)).strftime(TIME_FMT)
+    cutoff = min(cutoff, watermark).encode()
+    dropped = 0
+    read = written = 0
+    offset = None  # where the saved resume offset lands in the compacted file
+    tmp = FLOW_CSV + ".tmp"
+    with open(FLOW_CSV, "rb") as src, open(tmp, "wb") as dst:
+        for i, line in enumerate(src):
+            if read == state.get("offset"):
+                offset = written
+            read += len(line)
+            if i and line[:len(cutoff)] < cutoff and line.strip():
+                dropped += 1
+                continue
+            dst.write(line)
+            written += len(line)
+        if read == state.get("offset"):
+            offset = written
+    os.replace(tmp, FLOW_CSV)
+    _write_state({**state, "offset": offset})  # None → the next update() rescans by watermark
+    return dropped
+
+
+def summarize(level: str, metric: str, since: datetime.datetime,
+              until: datetime.datetime | None = None) -> Stat | None:
+    """Pooled stats for *metric* over buckets starting in [since, until). None if rollups aren't built."""
+    buckets = load(level)
+    if not buckets:
+        return None
+    total = Stat()
+    for bucket, stats in buckets.items():
+        if bucket >= since and (until is None or bucket < until) and metric in stats:
+            total.merge(stats[metric])
+    return total
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Update flow.csv rollups")
+    parser.add_argument("--compact-days", type=int, default=None,
+                        help=f"also drop raw readings older than N days (N >= {MIN_RAW_DAYS})")
+    args = parser.parse_args(argv)
+
+    folded = update()
+    print(f"✅ Rollups updated — {folded} new reading(s) folded")
+    if args.compact_days is not None:
+        dropped = compact(args.compact_days)
+        print(f"✅ Compacted {dropped} raw reading(s) older than {args.compact_days} days")
+
+
+if __name__ == "__main__":
+    main()
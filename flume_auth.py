@@ -1,44 +1,124 @@
 import os
 import json
 import base64
-import requests
+import time
 
+import http_client
 
-def get_flume_connection() -> tuple[dict, str]:
-    """Authenticate with Flume and return (headers, query_url).
+TOKEN_URL = "https://api.flumetech.com/oauth/token"
 
-    Reads credentials from env vars. Raises SystemExit on auth failure
-    so callers don't need to handle the error path.
-    """
-    auth = requests.post(
-        "https://api.flumetech.com/oauth/token",
-        data={
+# Access/refresh tokens plus user and device ids, so warm runs skip both auth round trips.
+# Holds bearer tokens, so it is written 0600 and lives in the user's home, outside the repo
+# and outside logs/.cache — that directory is saved to actions/cache, which pull requests can restore.
+CACHE_FILE = os.path.expanduser(os.getenv("FLUME_AUTH_CACHE", "~/.cache/oakspool/flume_auth.json"))
+# Where the cache used to live; deleted on sight so restored log-cache entries stop carrying it
+LEGACY_CACHE_FILE = "logs/.cache/flume_auth.json"
+REFRESH_MARGIN = 600  # seconds before expiry to refresh instead of reusing the token
+
+
+def _read_cache():
+    try:
+        with open(CACHE_FILE) as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        return None
+    # A cache written for another account or client is useless
+    if cache.get("username") != os.getenv("FLUME_USERNAME") or cache.get("client_id") != os.getenv("FLUME_CLIENT_ID"):
+        return None
+    return cache
+
+
+def _write_cache(cache):
+    os.makedirs(os.path.dirname(CACHE_FILE) or ".", exist_ok=True)
+    tmp = CACHE_FILE + ".tmp"
+    fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    with os.fdopen(fd, "w") as f:
+        json.dump(cache, f)
+    os.replace(tmp, CACHE_FILE)
+
+
+def _grant(data):
+    """POST an OAuth grant. Returns the token dict, or None after printing why it failed."""
+    auth = http_client.post(TOKEN_URL, endpoint="oauth/token", data={
+        "client_id": os.getenv("FLUME_CLIENT_ID"),
+        "client_secret": os.getenv("FLUME_CLIENT_SECRET"),
+        **data,
+    })
+    auth_resp = auth.json()
+    if auth.status_code != 200 or not auth_resp.get("data"):
+        if data["grant_type"] == "refresh_token":
+            print(f"⚠️  Flume token refresh failed ({auth.status_code}) — falling back to password grant")
+        else:
+            print(f"❌ Flume auth failed ({auth.status_code}): {auth_resp}")
+        return None
+    return auth_resp["data"][0]
+
+
+def _claims(access_token):
+    return json.loads(base64.urlsafe_b64decode(access_token.split(".")[1] + "=="))
+
+
+def _token(cache, force_refresh):
+    """Return a cache dict holding a valid access token, refreshing or re-authenticating as needed."""
+    if cache and not force_refresh and cache["expires_at"] - REFRESH_MARGIN > time.time():
+        return cache
+
+    token = None
+    if cache and cache.get("refresh_token"):
+        token = _grant({"grant_type": "refresh_token", "refresh_token": cache["refresh_token"]})
+    if token is None:
+        token = _grant({
             "grant_type": "password",
-            "client_id": os.getenv("FLUME_CLIENT_ID"),
-            "client_secret": os.getenv("FLUME_CLIENT_SECRET"),
             "username": os.getenv("FLUME_USERNAME"),
             "password": os.getenv("FLUME_PASSWORD"),
-        }
-    )
-    auth_resp = auth.json()
-    if auth.status_code != 200 or not auth_resp.get("data"):
-        print(f"❌ Flume auth failed ({auth.status_code}): {auth_resp}")
+        })
+    if token is None:
         raise SystemExit(1)
 
-    access_token = auth_resp["data"][0]["access_token"]
-    headers = {"Authorization": f"Bearer {access_token}"}
-    user_id = json.loads(
-        base64.urlsafe_b64decode(access_token.split(".")[1] + "==")
-    )["user_id"]
-
-    devices = requests.get(
-        f"https://api.flumetech.com/users/{user_id}/devices", headers=headers
-    ).json()
-    type2 = [d for d in devices["data"] if d["type"] == 2]
-    if not type2:
-        print("❌ No Flume water monitor device (type 2) found on this account")
-        raise SystemExit(1)
-    device_id = type2[0]["id"]
-    query_url = f"https://api.flumetech.com/users/{user_id}/devices/{device_id}/query"
+    claims = _claims(token["access_token"])
+    expires_at = time.time() + token["expires_in"] if token.get("expires_in") else claims.get("exp", 0)
+    fresh = {
+        "username": os.getenv("FLUME_USERNAME"),
+        "client_id": os.getenv("FLUME_CLIENT_ID"),
+        "access_token": token["access_token"],
+        "refresh_token": token.get("refresh_token") or (cache or {}).get("refresh_token"),
+        "expires_at": expires_at,
+        "user_id": claims["user_id"],
+    }
+    # Keep the device lookup unless the token now belongs to a different user
+    if cache and cache.get("user_id") == fresh["user_id"] and cache.get("device_id"):
+        fresh["device_id"] = cache["device_id"]
+    return fresh
+
+
+def get_flume_connection(force_refresh: bool = False) -> tuple[dict, str]:
+    """Authenticate with Flume and return (headers, query_url).
+
+    Reads credentials from env vars. Tokens and device ids are reused from
+    CACHE_FILE while valid; the token is refreshed with its refresh token
+    shortly before expiry, falling back to the password grant. Pass
+    force_refresh=True after a 401 to get a new token regardless.
+    Raises SystemExit on auth failure so callers don't need to handle the
+    error path.
+    """
+    if os.path.exists(LEGACY_CACHE_FILE):
+        os.remove(LEGACY_CACHE_FILE)
+    cached = _read_cache()
+    cache = dict(_token(cached, force_refresh))
+    headers = {"Authorization": f"Bearer {cache['access_token']}"}
+    user_id = cache["user_id"]
+
+    if not cache.get("device_id"):
+        devices = http_client.get(
+            f"https://api.flumetech.com/users/{user_id}/devices", headers=headers, endpoint="devices"
+        ).json()
+        type2 = [d for d in devices["data"] if d["type"] == 2]
+        if not type2:
+            print("❌ No Flume water monitor device (type 2) found on this account")
+            raise SystemExit(1)
+        cache["device_id"] = type2[0]["id"]
+    if cache != cached:
+        _write_cache(cache)
 
+    query_url = f"https://api.flumetech.com/users/{user_id}/devices/{cache['device_id']}/query"
     return headers, query_url
@@ -0,0 +1,96 @@
+"""Async Flume query client: independent bucket queries run concurrently.
+
+Each query() is its own POST, sent from a worker thread through http_client
+(pooled session, per-host timeouts and retry). Up to *concurrency* of them are
+in flight at once, so a multi-query check takes about as long as its slowest
+query. query_many() fans a batch out and merges the results by request_id.
+
+Usage:
+    async with FlumeClient() as flume:
+        results = await flume.query_many({
+            "min": ("MIN", since, until),
+            "hour": ("HR", since, until),
+        })
+"""
+import asyncio
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Literal
+
+import http_client
+from flume_auth import get_flume_connection
+
+Bucket = Literal["MIN", "HR", "DAY", "MON", "YR"]
+
+CONCURRENCY = 4     # Flume rate-limits per account; a handful in flight is plenty
+TIMEOUT = (5, 60)   # a long MIN range can take a while to come back
+
+
+class FlumeAuthError(RuntimeError):
+    """Flume rejected the credentials or token (details are printed by flume_auth)."""
+
+
+@dataclass(frozen=True)
+class Reading:
+    datetime: str  # local time as Flume reports it, "YYYY-MM-DD HH:MM:SS"
+    value: float   # gallons
+
+
+def _fmt(when):
+    return when.strftime("%Y-%m-%dT%H:%M:%S") if isinstance(when, datetime) else when
+
+
+class FlumeClient:
+    def __init__(self, concurrency: int = CONCURRENCY):
+        self._limit = asyncio.Semaphore(max(1, concurrency))
+        self._auth_lock = asyncio.Lock()
+        self._conn = None  # (headers, query_url)
+
+    async def __aenter__(self):
+        await self._connect()
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def _connect(self, stale=None):
+        """Authenticate once; after a 401 on *stale*, re-authenticate once for every waiter."""
+        async with self._auth_lock:
+            if self._conn is None or self._conn is stale:
+                try:
+                    self._conn = await asyncio.to_thread(get_flume_connection, stale is not None)
+                except SystemExit as err:  # flume_auth exits the script; a long-lived caller must survive it
+                    raise FlumeAuthError("Flume authentication failed") from err
+            return self._conn
+
+    async def _post(self, queries):
+        conn = self._conn or await self._connect()
+        async with self._limit:
+            resp = await asyncio.to_thread(http_client.post, conn[1], headers=conn[0],
+                                           json={"queries": queries}, timeout=TIMEOUT, endpoint="query")
+            if resp.status_code == 401:  # cached token revoked before its expiry
+                conn = await self._connect(stale=conn)
+                resp = await asyncio.to_thread(http_client.post, conn[1], headers=conn[0],
+                                               json={"queries": queries}, timeout=TIMEOUT, endpoint="query")
+        # Error pages (a 502 from a proxy, say) needn't be JSON, so only a 200 is parsed
+        if resp.status_code != 200:
+            raise RuntimeError(f"Flume query failed ({resp.status_code})")
+        body = resp.json()
+        if not body.get("success", True):
+            raise RuntimeError(f"Flume query failed: {body.get('message', body)}")
+        return body.get("data", [])
+
+    async def query(self, bucket: Bucket, since: datetime | str, until: datetime | str,
+                    request_id: str = "q") -> list[Reading]:
+        """Readings for one bucket between *since* and *until* (local time)."""
+        data = await self._post([{"request_id": request_id, "bucket": bucket,
+                                  "since_datetime": _fmt(since), "until_datetime": _fmt(until)}])
+        points = next((entry[request_id] for entry in data if request_id in entry), [])
+        return [Reading(p["datetime"], p["value"]) for p in points]
+
+    async def query_many(self, queries: dict[str, tuple[Bucket, datetime | str, datetime | str]]
+                         ) -> dict[str, list[Reading]]:
+        """Run every {request_id: (bucket, since, until)} concurrently; results keyed by request_id."""
+        ids = list(queries)
+        results = await asyncio.gather(*(self.query(*queries[rid], request_id=rid) for rid in ids))
+        return dict(zip(ids, results))
@@ -0,0 +1,114 @@
+"""Prefix-sum index over the daily Flume log.
+
+usage_between(start, end) returns CCF, dollar cost (at each season's rate) and
+the number of logged days between two dates with a handful of array lookups,
+however many seasons are on file. The index is a dense day-by-day grid from the
+first to the last logged day; missing days count as zero usage and are left out
+of the day count. A range that takes in a logged day with no rate on file has a
+NaN cost.
+
+Readers just call load(); the persisted copy is rebuilt on demand when the log changes.
+"""
+import datetime
+import hashlib
+import os
+from dataclasses import dataclass
+
+import numpy as np
+
+import log_cache
+from seasons_loader import index as season_index
+
+INDEX_FILE = os.path.join(log_cache.CACHE_DIR, "flume_index.npz")
+SEASONS_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "seasons.txt")
+
+
+@dataclass(frozen=True)
+class Usage:
+    ccf: float
+    cost: float
+    days: int
+
+
+class UsageIndex:
+    def __init__(self, first, cum_ccf, cum_cost, cum_days, cum_unrated):
+        self.first = first          # datetime.date of grid position 0, or None when empty
+        self._cum_ccf = cum_ccf     # each array has len(grid) + 1 entries, starting at 0
+        self._cum_cost = cum_cost   # cost of the rated days only
+        self._cum_days = cum_days
+        self._cum_unrated = cum_unrated
+
+    @classmethod
+    def build(cls, dates, ccf):
+        """Build from parallel date (datetime64[D]) and CCF arrays, in any order."""
+        ok = ~np.isnat(dates) & ~np.isnan(ccf)
+        dates, ccf = dates[ok].astype("datetime64[D]"), ccf[ok]
+        if not len(dates):
+            zero = np.zeros(1)
+            return cls(None, zero, zero, zero.astype(np.int64), zero.astype(np.int64))
+        first = dates.min()
+        pos = (dates - first).astype(np.int64)
+        # Years without a seasons.txt line (off-season rows from a year not yet configured)
+        # carry no rate. They are counted separately so a range touching one reports an
+        # unknown (NaN) cost instead of silently pricing those days at zero.
+        rates = season_index().rates(dates)
+        unrated = np.isnan(rates)
+
+        n = int(pos.max()) + 1
+        daily_ccf, daily_cost = np.zeros(n), np.zeros(n)
+        logged, no_rate = np.zeros(n, dtype=np.int64), np.zeros(n, dtype=np.int64)
+        daily_ccf[pos] = ccf
+        daily_cost[pos] = np.where(unrated, 0.0, ccf * rates)
+        logged[pos] = 1
+        no_rate[pos] = unrated
+        return cls(first.item(),
+                   np.concatenate([[0.0], np.cumsum(daily_ccf)]),
+                   np.concatenate([[0.0], np.cumsum(daily_cost)]),
+                   np.concatenate([[0], np.cumsum(logged)]),
+                   np.concatenate([[0], np.cumsum(no_rate)]))
+
+    def _pos(self, d):
+        """Grid position of date *d*, clamped to [0, len(grid)]."""
+        return min(max((d - self.first).days, 0), len(self._cum_ccf) - 1)
+
+    def usage_between(self, start: datetime.date, end: datetime.date) -> Usage:
+        """Totals for start <= date <= end (inclusive); cost is NaN if any day in range has no rate."""
+        if self.first is None or end < start:
+            return Usage(0.0, 0.0, 0)
+        lo, hi = self._pos(start), self._pos(end + datetime.timedelta(days=1))
+        cost = float(self._cum_cost[hi] - self._cum_cost[lo])
+        if self._cum_unrated[hi] != self._cum_unrated[lo]:
+            cost = float("nan")
+        return Usage(float(self._cum_ccf[hi] - self._cum_ccf[lo]), cost,
+                     int(self._cum_days[hi] - self._cum_days[lo]))
+
+
+def _source_key():
+    """Identifies the Flume log bytes and season rates the index was built from."""
+    h = hashlib.sha256((log_cache.source_sha256("flume") or "").encode())
+    if os.path.exists(SEASONS_FILE):
+        with open(SEASONS_FILE, "rb") as f:
+            h.update(f.read())
+    return h.hexdigest()
+
+
+def load() -> UsageIndex:
+    """Return the usage index, rebuilding and re-saving it if the log or rates changed."""
+    cols = log_cache.load("flume")
+    key = _source_key()
+    try:
+        with np.load(INDEX_FILE) as z:
+            if str(z["key"]) == key:
+                first = z["first"].item() if z["cum_ccf"].size > 1 else None
+                return UsageIndex(first, z["cum_ccf"], z["cum_cost"], z["cum_days"], z["cum_unrated"])
+    except (OSError, KeyError, ValueError):
+        pass
+
+    index = UsageIndex.build(cols["date"], cols["ccf"])
+    os.makedirs(os.path.dirname(INDEX_FILE), exist_ok=True)
+    tmp = INDEX_FILE + ".tmp.npz"
+    np.savez(tmp, key=key, first=np.datetime64(index.first or "NaT", "D"),
+             cum_ccf=index._cum_ccf, cum_cost=index._cum_cost, cum_days=index._cum_days,
+             cum_unrated=index._cum_unrated)
+    os.replace(tmp, INDEX_FILE)
+    return index
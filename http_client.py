@@ -0,0 +1,146 @@
+"""Shared HTTP transport for every outbound call (Flume, Slack, Leslie's).
+
+One keep-alive requests.Session per process, a connect/read timeout per host,
+jittered exponential retry on 429/5xx and connection errors (honouring
+Retry-After), and one latency line per request. After the last retry the
+final response is returned as-is, or the final exception re-raised, so
+callers keep their own status handling.
+
+Usage: resp = http_client.post(url, json=payload)
+"""
+import os
+import random
+import threading
+import time
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import NewConnectionError
+
+# (connect, read) seconds, by host; anything else gets DEFAULT_TIMEOUT
+TIMEOUTS = {
+    "api.flumetech.com": (5, 30),
+    "slack.com":         (5, 10),
+    "api.lesl.cloud":    (5, 30),
+    "lesliespool.com":   (5, 20),
+}
+DEFAULT_TIMEOUT = (5, 30)
+
+RETRIES = 3
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+BACKOFF_BASE = 1.0   # seconds before the first retry; doubles each time
+BACKOFF_MAX = 60.0
+POOL_SIZE = 10       # keep-alive connections per host — enough for the backfill thread pool
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def session() -> requests.Session:
+    """The process-wide pooled session, created on first use."""
+    global _session
+    with _session_lock:
+        if _session is None:
+            _session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=POOL_SIZE, pool_maxsize=POOL_SIZE)
+            _session.mount("https://", adapter)
+            _session.mount("http://", adapter)
+    return _session
+
+
+def _retry_after(resp):
+    try:
+        return float(resp.headers.get("Retry-After", 0))
+    except ValueError:  # an HTTP date — not worth parsing, fall back to backoff
+        return 0.0
+
+
+def _never_connected(err):
+    """True if *err* shows the request never reached the server (connect timeout or refused/unresolved)."""
+    if isinstance(err, requests.ConnectTimeout):
+        return True
+    # requests wraps urllib3's MaxRetryError, whose .reason is the underlying error
+    pending, seen = [err], set()
+    while pending:
+        e = pending.pop()
+        if e is None or id(e) in seen:
+            continue
+        seen.add(id(e))
+        if isinstance(e, NewConnectionError):
+            return True
+        pending += [getattr(e, "reason", None), e.__cause__, e.__context__,
+                    *(a for a in getattr(e, "args", ()) if isinstance(a, BaseException))]
+    return False
+
+
+def request(method: str, url: str, *, retries: int = RETRIES, timeout=None, idempotent: bool = True,
+            endpoint: str | None = None, **kwargs) -> requests.Response:
+    """Send one request through the shared session, retrying transient failures.
+
+    Pass idempotent=False for calls that must not be repeated once the server
+    may have acted on them (e.g. posting a Slack message): those are retried
+    only when the connection was never made or the server answered 429.
+    *endpoint* names the call in the latency line, which otherwise shows only
+    the host: paths carry account and device IDs that don't belong in logs.
+    """
+    parts = urlsplit(url)
+    timeout = timeout or TIMEOUTS.get(parts.hostname, DEFAULT_TIMEOUT)
+    label = f"{method} {parts.hostname}" + (f" {endpoint}" if endpoint else "")
+    retry_statuses = RETRY_STATUSES if idempotent else {429}
+    for attempt in range(retries + 1):
+        start = time.perf_counter()
+        try:
+            resp = session().request(method, url, timeout=timeout, **kwargs)
+        except requests.RequestException as err:
+            ms = (time.perf_counter() - start) * 1000
+            print(f"  🌐 {label} → {type(err).__name__} after {ms:.0f} ms")
+            # A read timeout or dropped connection may mean the server already acted
+            retryable = isinstance(err, (requests.ConnectionError, requests.Timeout)) if idempotent \
+                else _never_connected(err)
+            if attempt == retries or not retryable:
+                raise
+            wait = 0.0
+        else:
+            ms = (time.perf_counter() - start) * 1000
+            print(f"  🌐 {label} → {resp.status_code} in {ms:.0f} ms")
+            if resp.status_code not in retry_statuses or attempt == retries:
+                return resp
+            wait = _retry_after(resp)
+        backoff = min(BACKOFF_MAX, BACKOFF_BASE * 2 ** attempt)
+        delay = max(wait, random.uniform(backoff / 2, backoff))
+        print(f"  ⏳ retry {attempt + 1}/{retries} in {delay:.1f}s")
+        time.sleep(delay)
+
+
+def get(url: str, **kwargs) -> requests.Response:
+    return request("GET", url, **kwargs)
+
+
+def post(url: str, **kwargs) -> requests.Response:
+    return request("POST", url, **kwargs)
+
+
+def post_slack(channel: str | None, text: str, blocks: bool = False) -> bool:
+    """Post *text* to a Slack channel (as an mrkdwn section too if *blocks*). Returns True if Slack accepted it."""
+    token = os.getenv("SLACK_BOT_TOKEN")  # read late — scripts call load_dotenv() after importing this
+    if not token or not channel:
+        print("ℹ️ Slack not configured, skipping.")
+        return False
+    payload = {"channel": channel, "text": text}
+    if blocks:
+        payload["blocks"] = [{"type": "section", "text": {"type": "mrkdwn", "text": text}}]
+    try:
+        r = post(
+            "https://slack.com/api/chat.postMessage",
+            headers={"Authorization": f"Bearer {token}", "Content-Type": "application/json"},
+            json=payload,
+            endpoint="chat.postMessage",
+            idempotent=False,  # a retried timeout could post the alert twice
+        )
+    except requests.RequestException as err:  # callers treat Slack as best-effort
+        print(f"⚠️ Slack post failed: {type(err).__name__}")
+        return False
+    ok = r.ok and r.json().get("ok")
+    print("📣 Slack update sent." if ok else f"⚠️ Slack post failed: {r.status_code}")
+    return bool(ok)
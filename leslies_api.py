@@ -14,6 +14,8 @@ from typing import Any
 
 import requests
 
+import http_client
+
 _LOGGER = logging.getLogger("leslies_api")
 
 # ---------------------------------------------------------------------------
@@ -98,7 +100,6 @@ class LesliesPoolApi:
         self._pool_profile_id = pool_profile_id
         self._pool_name = pool_name
 
-        self._session = requests.Session()
         self._sanitizer_lookup: dict[str, str] | None = None
         self._last_successful_values: dict[str, Any] = {}
 
@@ -121,7 +122,7 @@ class LesliesPoolApi:
         """
         creds = base64.b64encode(f"{email}:{password}".encode()).decode()
         url = f"{OCAPI_BASE_URL}/customers/auth?client_id={OCAPI_CLIENT_ID}"
-        r = requests.post(
+        r = http_client.post(
             url,
             headers={
                 "Authorization": f"Basic {creds}",
@@ -130,6 +131,7 @@ class LesliesPoolApi:
             },
             json={"type": "credentials"},
             timeout=20,
+            endpoint="customers/auth",
         )
         if r.status_code == 401:
             raise InvalidAuthError("Leslie's rejected the email/password")
@@ -141,7 +143,7 @@ class LesliesPoolApi:
         if not jwt or not customer_id:
             raise LesliesPoolError("OCAPI auth response missing JWT or customer_id")
 
-        r = requests.get(
+        r = http_client.get(
             f"{OCAPI_BASE_URL}/customers/{customer_id}?client_id={OCAPI_CLIENT_ID}",
             headers={
                 "Authorization": f"Bearer {jwt}",
@@ -149,6 +151,7 @@ class LesliesPoolApi:
                 "Accept": "application/json",
             },
             timeout=20,
+            endpoint="customers",
         )
         r.raise_for_status()
         relate_id = r.json().get("c_relateCustomerID")
@@ -160,7 +163,7 @@ class LesliesPoolApi:
     def discover_pool_profiles(email: str, relate_customer_id: str) -> list[PoolProfile]:
         """Return the user's registered pools."""
         auth = base64.b64encode(f"{BOOMI_BASIC_USER}:{BOOMI_BASIC_PASS}".encode()).decode()
-        r = requests.get(
+        r = http_client.get(
             f"{BOOMI_BASE_URL}/ws/rest/Mobile/RelateORCE/poolProfiles/v1",
             headers={
                 "Authorization": f"Basic {auth}",
@@ -171,6 +174,7 @@ class LesliesPoolApi:
                 "DDP_ID": relate_customer_id,
             },
             timeout=20,
+            endpoint="poolProfiles",
         )
         r.raise_for_status()
         raw = r.json().get("pool_profiles", [])
@@ -189,10 +193,11 @@ class LesliesPoolApi:
     def _get_sanitizer_lookup(self) -> dict[str, str]:
         if self._sanitizer_lookup is None:
             try:
-                r = self._session.get(
+                r = http_client.get(
                     f"{BOOMI_BASE_URL}/ws/rest/Mobile/poolSanitizers/v1",
                     headers=self._boomi_headers(),
                     timeout=20,
+                    endpoint="poolSanitizers",
                 )
                 r.raise_for_status()
                 self._sanitizer_lookup = {
@@ -252,10 +257,11 @@ class LesliesPoolApi:
             raise
 
     def _fetch_home_dashboard(self) -> _HomeData:
-        r = self._session.get(
+        r = http_client.get(
             f"{BOOMI_BASE_URL}/ws/rest/Mobile/RelateORCE/home/v4",
             headers=self._boomi_headers(),
             timeout=20,
+            endpoint="home",
         )
         r.raise_for_status()
         profiles = r.json().get("pool_profile") or []
@@ -269,7 +275,7 @@ class LesliesPoolApi:
     def _fetch_water_test_history(self) -> _History:
         end = (datetime.now(timezone.utc) + timedelta(days=365)).strftime("%Y%m%d 235959.999")
         start = "20200101 000000.000"
-        r = self._session.get(
+        r = http_client.get(
             f"{BOOMI_BASE_URL}/ws/rest/Mobile/waterTesting/history/v2",
             headers=self._boomi_headers(),
             params={
@@ -278,17 +284,19 @@ class LesliesPoolApi:
                 "end_date": end,
             },
             timeout=30,
+            endpoint="waterTesting/history",
         )
         r.raise_for_status()
         return _History(r.json().get("water_test_history", {}).get("water_tests") or [])
 
     def _fetch_days_since_last_test(self) -> int | None:
         try:
-            r = self._session.get(
+            r = http_client.get(
                 f"{BOOMI_BASE_URL}/ws/rest/Mobile/waterTesting/DaysSinceWaterTest",
                 headers=self._boomi_headers(),
                 params={"pool_profile_id": self._pool_profile_id},
                 timeout=15,
+                endpoint="DaysSinceWaterTest",
             )
             r.raise_for_status()
             return int(r.json().get("no_of_days_since_last_watertest"))
@@ -0,0 +1,164 @@
+"""Binary columnar sidecars for the log CSVs.
+
+The CSVs stay the source of truth. Each one gets a directory of .npy column
+files under logs/.cache/<name>/ plus a meta.json recording the size, mtime and
+SHA-256 of the CSV it was built from. On load the sidecar is reused as-is when
+the CSV is unchanged, extended by parsing only the new tail when rows were
+appended, and rebuilt from scratch otherwise.
+
+Usage: cols = log_cache.load("flow")  # {"read_datetime": datetime64 array, "flow": float64 array, ...}
+"""
+import csv
+import datetime
+import hashlib
+import io
+import json
+import os
+
+import numpy as np
+
+CACHE_DIR = "logs/.cache"
+
+CHEM_COLS = ("free_chlorine", "total_chlorine", "ph", "alkalinity", "calcium",
+             "cyanuric_acid", "iron", "copper", "phosphates", "salt")
+
+# Column kinds: "float" → float64 (NaN when blank/invalid), "text" → str,
+# anything else is a strptime format → datetime64 (NaT when unparseable).
+SOURCES = {
+    "flow": ("logs/flow.csv", {
+        "read_datetime": "%Y-%m-%d %H:%M:%S",
+        "vac_press": "float", "sys_press": "float", "f1_press": "float",
+        "flow": "float", "flow_std": "float",
+    }),
+    "flume": ("logs/flume_usage_log.csv", {"date": "%Y-%m-%d", "ccf": "float"}),
+    "leslies": ("logs/leslies-log.csv", {
+        "run_timestamp": "text", "test_date": "%m/%d/%Y",
+        **{c: "float" for c in CHEM_COLS},
+        "in_store": "text",
+    }),
+}
+
+
+def _unit(fmt):
+    return "s" if "%H" in fmt else "D"
+
+
+def _parse(text, schema, header=None):
+    """Parse CSV *text* into typed columns. *header* is given when *text* is a tail without one."""
+    reader = csv.reader(io.StringIO(text))
+    if header is None:
+        header = next(reader, [])
+    pos = {name: i for i, name in enumerate(header)}
+    raw = {name: [] for name in schema}
+    for row in reader:
+        if not row:
+            continue
+        for name in schema:
+            i = pos.get(name)
+            raw[name].append(row[i].strip() if i is not None and i < len(row) else "")
+
+    cols = {}
+    for name, kind in schema.items():
+        values = raw[name]
+        if kind == "float":
+            out = np.full(len(values), np.nan)
+            for j, v in enumerate(values):
+                try:
+                    out[j] = float(v)
+                except ValueError:
+                    pass
+            cols[name] = out
+        elif kind == "text":
+            cols[name] = np.array(values, dtype=str)
+        else:
+            out = np.full(len(values), np.datetime64("NaT"), dtype=f"datetime64[{_unit(kind)}]")
+            for j, v in enumerate(values):
+                try:
+                    out[j] = datetime.datetime.strptime(v, kind)
+                except ValueError:
+                    pass
+            cols[name] = out
+    return header, cols
+
+
+def _read_meta(cache):
+    try:
+        with open(os.path.join(cache, "meta.json")) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _read_cols(cache, schema, rows):
+    try:
+        cols = {name: np.load(os.path.join(cache, f"{name}.npy")) for name in schema}
+    except (OSError, ValueError):
+        return None
+    return cols if all(len(c) == rows for c in cols.values()) else None
+
+
+def _save(cache, cols, meta):
+    os.makedirs(cache, exist_ok=True)
+    for name, col in cols.items():
+        tmp = os.path.join(cache, f"{name}.tmp.npy")
+        np.save(tmp, col)
+        os.replace(tmp, os.path.join(cache, f"{name}.npy"))
+    # meta.json is written last — it is what marks the column files as valid
+    tmp = os.path.join(cache, "meta.json.tmp")
+    with open(tmp, "w") as f:
+        json.dump(meta, f, indent=2)
+    os.replace(tmp, os.path.join(cache, "meta.json"))
+
+
+def load(name: str) -> dict[str, np.ndarray]:
+    """Return the typed columns of log *name*, in file order. Empty columns if the CSV is missing."""
+    path, schema = SOURCES[name]
+    if not os.path.exists(path):
+        return _parse("", schema, header=[])[1]
+    cache = os.path.join(CACHE_DIR, name)
+    st = os.stat(path)
+    meta = _read_meta(cache)
+
+    # Fast path: untouched since the sidecar was built
+    if meta and meta["size"] == st.st_size and meta["mtime_ns"] == st.st_mtime_ns:
+        cols = _read_cols(cache, schema, meta["rows"])
+        if cols is not None:
+            return cols
+
+    with open(path, "rb") as f:
+        data = f.read()
+    sha = hashlib.sha256(data).hexdigest()
+    fresh = {"size": st.st_size, "mtime_ns": st.st_mtime_ns, "sha256": sha}
+
+    if meta:
+        cols = _read_cols(cache, schema, meta["rows"])
+        old = meta["size"]
+        if cols is not None and sha == meta["sha256"]:
+            # Same bytes, new mtime (e.g. a fresh checkout) — just re-stamp
+            _save(cache, {}, meta | fresh)
+            return cols
+        if (cols is not None and st.st_size > old and data[old - 1:old] == b"\n"
+                and hashlib.sha256(data[:old]).hexdigest() == meta["sha256"]):
+            # Rows were only appended — parse the tail and extend
+            _, tail = _parse(data[old:].decode(), schema, header=meta["header"])
+            cols = {c: np.concatenate([cols[c], tail[c]]) for c in schema}
+            _save(cache, cols, meta | fresh | {"rows": len(next(iter(cols.values())))})
+            return cols
+
+    header, cols = _parse(data.decode(), schema)
+    _save(cache, cols, fresh | {"header": header, "rows": len(next(iter(cols.values())))})
+    return cols
+
+
+def source_sha256(name: str) -> str | None:
+    """SHA-256 of the CSV the sidecar was last built from (call load() first). None if the CSV is missing."""
+    if not os.path.exists(SOURCES[name][0]):
+        return None
+    meta = _read_meta(os.path.join(CACHE_DIR, name))
+    return meta["sha256"] if meta else None
+
+
+if __name__ == "__main__":
+    for _name in SOURCES:
+        _cols = load(_name)
+        print(f"✅ {_name}: {len(next(iter(_cols.values())))} rows cached")
@@ -1,19 +1,47 @@
+import argparse
 import csv
 import datetime
+import io
+import json
 import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from zoneinfo import ZoneInfo
 
-import pytz
-import requests
-
+import http_client
 from flume_auth import get_flume_connection
+from seasons_loader import load as load_seasons
 
 CSV_FILE = "logs/flume_usage_log.csv"
 CCF_CONVERSION = 748.05
+# Pending in-place tail rewrite; finished by the next run if this one is interrupted
+JOURNAL = CSV_FILE + ".journal"
+TAIL_BLOCK = 4096
+
+# Backfill batching: gap runs closer than BACKFILL_JOIN_DAYS are fetched as one range
+# (the extra days are discarded), split into queries of at most BACKFILL_QUERY_DAYS
+# and sent BACKFILL_BATCH queries per request, BACKFILL_WORKERS requests at a time.
+# Rate-limit backoff lives in http_client.
+BACKFILL_JOIN_DAYS = 7
+BACKFILL_QUERY_DAYS = 120
+BACKFILL_BATCH = 10
+BACKFILL_WORKERS = 2
+BACKFILL_RETRIES = 5  # a long run is more likely to hit the rate limit than the daily pull
+
 
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Pull daily Flume usage into the log")
+    parser.add_argument("--backfill", action="store_true",
+                        help="re-query every missing or 0.0 day in all seasons instead of the last 30 days")
+    parser.add_argument("--dry-run", action="store_true", help="with --backfill: list the gap ranges only")
+    parser.add_argument("--workers", type=int, default=BACKFILL_WORKERS,
+                        help=f"with --backfill: concurrent requests (default {BACKFILL_WORKERS})")
+    args = parser.parse_args(argv)
 
-def main():
-    central = pytz.timezone("US/Central")
-    now = datetime.datetime.now(pytz.utc).astimezone(central)
+    now = datetime.datetime.now(datetime.timezone.utc).astimezone(ZoneInfo("US/Central"))
+    if args.backfill:
+        backfill(now.date(), dry_run=args.dry_run, workers=args.workers)
+        return
 
     headers, query_url = get_flume_connection()
 
@@ -25,39 +53,266 @@ def main():
             "until_datetime": now.strftime("%Y-%m-%dT23:59:59Z"),
         }]
     }
-    resp = requests.post(query_url, headers=headers, json=payload)
+    resp = http_client.post(query_url, headers=headers, json=payload, endpoint="query")
+    if resp.status_code == 401:  # cached token revoked before its expiry
+        headers, query_url = get_flume_connection(force_refresh=True)
+        resp = http_client.post(query_url, headers=headers, json=payload, endpoint="query")
     resp_json = resp.json()
     if resp.status_code != 200 or not resp_json.get("data"):
         print(f"❌ Flume query failed ({resp.status_code}): {resp_json}")
         raise SystemExit(1)
 
     raw = resp_json["data"][0]["usage"]
+    merge(raw, now)
+
+
+def _line(date_str, value):
+    buf = io.StringIO()
+    csv.writer(buf).writerow([date_str, value])
+    return buf.getvalue().encode()
+
+
+def _tail_rows(path, since):
+    """Rows of *path* dated *since* or later, as (byte offset, date, raw line) — plus the file size.
+
+    The log is sorted by date, so this reads TAIL_BLOCK-sized chunks backwards
+    from the end only until it reaches a row older than *since*.
+    """
+    with open(path, "rb") as f:
+        size = pos = f.seek(0, os.SEEK_END)
+        buf = b""
+        while pos > 0:
+            step = min(TAIL_BLOCK, pos)
+            pos -= step
+            f.seek(pos)
+            buf = f.read(step) + buf
+            # The first (possibly partial) line only counts once we've read back to the start of the file
+            first = 0 if pos == 0 else buf.find(b"\n") + 1
+            if 0 < first < len(buf) and buf[first:first + 10].decode(errors="replace") < since:
+                break
+    rows = []
+    offset = pos + first if size else 0
+    for line in buf[first:].splitlines(keepends=True):
+        date_str = line[:10].decode(errors="replace")
+        if date_str[:1].isdigit() and date_str >= since:  # skips the header
+            rows.append((offset, date_str, line))
+        offset += len(line)
+    return rows, size
+
+
+def _apply_journal():
+    """Write the journaled tail into CSV_FILE in place, then drop the journal. Safe to repeat."""
+    with open(JOURNAL) as f:
+        journal = json.load(f)
+    with open(CSV_FILE, "r+b") as f:
+        f.seek(journal["offset"])
+        f.write(journal["tail"].encode())
+        f.truncate()
+        f.flush()
+        os.fsync(f.fileno())
+    os.remove(JOURNAL)
+
+
+def _rewrite_tail(offset, data):
+    """Replace CSV_FILE from byte *offset* on with *data*, without copying the rows before it.
+
+    The new tail is journaled (fsync + atomic replace) before the file is
+    touched, so a run killed mid-write is completed by the next one.
+    """
+    tmp = JOURNAL + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump({"offset": offset, "tail": data.decode()}, f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, JOURNAL)
+    _apply_journal()
+
+
+def merge(raw, now):
+    """Merge Flume DAY buckets *raw* into CSV_FILE, rewriting only the rows that changed."""
+    if os.path.exists(JOURNAL):
+        print("⚠️  Finishing an interrupted Flume log update")
+        _apply_journal()
+
+    fetched = {e["datetime"][:10]: round(e["value"] / CCF_CONVERSION, 4) for e in raw}
+    if not fetched:
+        print("⚠️  Flume returned no usage — log unchanged")
+        return
+
+    if not os.path.exists(CSV_FILE) or os.path.getsize(CSV_FILE) == 0:
+        os.makedirs(os.path.dirname(CSV_FILE), exist_ok=True)
+        tmp = CSV_FILE + ".tmp"
+        with open(tmp, "wb") as f:
+            f.write(_line("date", "ccf"))
+            f.writelines(_line(d, fetched[d]) for d in sorted(fetched))
+        os.replace(tmp, CSV_FILE)
+        print(f"✅ Flume log created — {len(fetched)} entries, latest: {max(fetched)}")
+        return
+
+    # Only the span the API returned can change; read just that much of the file
+    tail, size = _tail_rows(CSV_FILE, since=min(fetched))
+    old = [(d, line) for _, d, line in tail]
+    merged = {d: line if line.endswith(b"\n") else line + b"\r\n" for d, line in old}
+
+    # Re-accept last 3 days — Flume sometimes corrects recent readings retroactively
+    cutoff = (now - datetime.timedelta(days=3)).date().isoformat()
+    for date_str, value in fetched.items():
+        if date_str not in merged or date_str >= cutoff:
+            merged[date_str] = _line(date_str, value)
+    new = sorted(merged.items())
 
-    existing = {}
+    k = next((i for i, (a, b) in enumerate(zip(old, new)) if a != b), min(len(old), len(new)))
+    if k == len(old) == len(new):
+        print(f"✅ Flume log unchanged — latest: {new[-1][0]}")
+        return
+    offset = tail[k][0] if k < len(tail) else size
+    data = b"".join(line for _, line in new[k:])
+    if offset == size:
+        with open(CSV_FILE, "rb") as f:
+            f.seek(-1, os.SEEK_END)
+            if f.read(1) != b"\n":
+                data = b"\r\n" + data
+    _rewrite_tail(offset, data)
+    print(f"✅ Flume log updated — {len(new) - k} row(s) written from {new[k][0]}, latest: {new[-1][0]}")
+
+
+# ── backfill ──────────────────────────────────────────────────────────────────
+
+def _read_log():
+    """Whole log as {date string: ccf}. Backfill is a manual, whole-history run."""
+    log = {}
     if os.path.exists(CSV_FILE):
         with open(CSV_FILE, newline="") as f:
-            for row in csv.DictReader(f):
-                existing[row["date"]] = float(row["ccf"])
+            for r in csv.DictReader(f):
+                try:
+                    log[r["date"]] = float(r["ccf"])
+                except (TypeError, ValueError):
+                    pass
+    return log
 
-    # Re-accept last 3 days — Flume sometimes corrects recent readings retroactively
-    cutoff = (now - datetime.timedelta(days=3)).date()
-    merged = dict(existing)
-    for entry in raw:
-        date_str = entry["datetime"][:10]
-        date_obj = datetime.datetime.strptime(date_str, "%Y-%m-%d").date()
-        value = round(entry["value"] / CCF_CONVERSION, 4)
-        if date_str not in merged or date_obj >= cutoff:
-            merged[date_str] = value
-
-    tmp = CSV_FILE + ".tmp"
-    os.makedirs(os.path.dirname(CSV_FILE), exist_ok=True)
-    with open(tmp, "w", newline="") as f:
-        writer = csv.writer(f)
-        writer.writerow(["date", "ccf"])
-        for d in sorted(merged):
-            writer.writerow([d, merged[d]])
-    os.replace(tmp, CSV_FILE)
-    print(f"✅ Flume log updated — {len(merged)} entries, latest: {max(merged)}")
+
+def _gap_days(log, today):
+    """Sorted season days up to *today* that are missing from *log* or logged as 0.0."""
+    gaps = []
+    for season in load_seasons():
+        d = season.open
+        while d <= min(season.close, today):
+            if not log.get(d.isoformat()):
+                gaps.append(d)
+            d += datetime.timedelta(days=1)
+    return sorted(gaps)
+
+
+def _coalesce(days, join=BACKFILL_JOIN_DAYS, max_days=BACKFILL_QUERY_DAYS):
+    """Collapse sorted *days* into the fewest (start, end) ranges, each at most *max_days* long."""
+    ranges = []
+    for d in days:
+        if ranges and (d - ranges[-1][1]).days <= join and (d - ranges[-1][0]).days < max_days:
+            ranges[-1][1] = d
+        else:
+            ranges.append([d, d])
+    return [tuple(r) for r in ranges]
+
+
+def _query_batch(conn, queries, reconnect):
+    """POST one batch of queries and return its "data" list; http_client retries transient failures.
+
+    A 401 means the token was revoked mid-run: reconnect(conn) gets a fresh one and the batch is sent once more.
+    """
+    for attempt in range(2):
+        headers, query_url = conn
+        resp = http_client.post(query_url, headers=headers, json={"queries": queries}, endpoint="query",
+                                retries=BACKFILL_RETRIES, timeout=(5, 60))
+        if resp.status_code != 401 or attempt:
+            break
+        conn = reconnect(conn)
+    body = resp.json()
+    if resp.status_code != 200 or not body.get("data"):
+        raise RuntimeError(f"Flume query failed ({resp.status_code}): {body}")
+    return body["data"]
+
+
+def backfill(today, dry_run=False, workers=BACKFILL_WORKERS):
+    """Re-query every missing or 0.0 season day and fill in what Flume has for them.
+
+    A batch that still fails after retries doesn't abort the run: every batch
+    that succeeded is written, then the failed ranges are listed and the run
+    exits non-zero so it can be re-run for just those.
+    """
+    # The backfill replaces the whole file; a journaled tail left pending would later be
+    # written at its old byte offset into the new, longer file
+    if os.path.exists(JOURNAL):
+        print("⚠️  Finishing an interrupted Flume log update")
+        _apply_journal()
+    log = _read_log()
+    gaps = _gap_days(log, today)
+    ranges = _coalesce(gaps)
+    batches = [ranges[i:i + BACKFILL_BATCH] for i in range(0, len(ranges), BACKFILL_BATCH)]
+    print(f"🔎 {len(gaps)} missing/zero day(s) in {len(ranges)} range(s) → {len(batches)} request(s)")
+    for start, end in ranges:
+        print(f"  {start} → {end}")
+    if dry_run or not gaps:
+        return
+
+    auth = {"conn": get_flume_connection()}
+    auth_lock = threading.Lock()
+
+    def reconnect(stale):
+        with auth_lock:  # one re-auth however many workers saw the 401
+            if auth["conn"] is stale:
+                auth["conn"] = get_flume_connection(force_refresh=True)
+            return auth["conn"]
+
+    def run(batch):
+        queries = [{"request_id": f"r{i}", "bucket": "DAY",
+                    "since_datetime": start.strftime("%Y-%m-%dT00:00:00Z"),
+                    "until_datetime": end.strftime("%Y-%m-%dT23:59:59Z")}
+                   for i, (start, end) in enumerate(batch)]
+        return _query_batch(auth["conn"], queries, reconnect)
+
+    fetched = {}
+    failed = []
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        futures = {pool.submit(run, batch): batch for batch in batches}
+        for future in as_completed(futures):
+            try:
+                data = future.result()
+            except (Exception, SystemExit) as err:  # SystemExit: flume_auth couldn't re-authenticate
+                failed.extend(futures[future])
+                print(f"❌ Batch {futures[future][0][0]} → {futures[future][-1][1]} failed: {err}")
+                continue
+            for entry in data:
+                for key, points in entry.items():
+                    if key in ("request_id", "success", "code", "message"):
+                        continue
+                    for p in points:
+                        fetched[p["datetime"][:10]] = round(p["value"] / CCF_CONVERSION, 4)
+
+    # Only gap days are touched: missing days take whatever Flume has, 0.0 days only a non-zero value
+    filled = 0
+    for d in gaps:
+        key = d.isoformat()
+        value = fetched.get(key)
+        if value is None or (key in log and not value):
+            continue
+        log[key] = value
+        filled += 1
+    if not filled:
+        print("✅ Backfill found nothing new — log unchanged")
+    else:
+        tmp = CSV_FILE + ".tmp"
+        os.makedirs(os.path.dirname(CSV_FILE), exist_ok=True)
+        with open(tmp, "wb") as f:
+            f.write(_line("date", "ccf"))
+            f.writelines(_line(d, log[d]) for d in sorted(log))
+        os.replace(tmp, CSV_FILE)
+        print(f"✅ Backfilled {filled} of {len(gaps)} gap day(s)")
+
+    if failed:
+        print(f"❌ {len(failed)} range(s) could not be fetched — re-run --backfill to retry them:")
+        for start, end in sorted(failed):
+            print(f"  {start} → {end}")
+        raise SystemExit(1)
 
 
 if __name__ == "__main__":
@@ -3,8 +3,7 @@ import os
 from datetime import datetime
 from zoneinfo import ZoneInfo
 
-import requests
-
+import http_client
 from leslies_api import InvalidAuthError, LesliesPoolApi, PoolNotFoundError
 
 LOG_DIR = "logs"
@@ -14,7 +13,6 @@ USERNAME = os.getenv("LESLIES_USERNAME")
 PASSWORD = os.getenv("LESLIES_PASSWORD")
 POOLID = os.getenv("LESLIES_POOLID")
 POOLNAME = os.getenv("LESLIES_POOLNAME")
-SLACK_TOKEN = os.getenv("SLACK_BOT_TOKEN")
 SLACK_CHANNEL = os.getenv("SLACK_CHANNEL")
 
 FIELDNAMES = [
@@ -114,21 +112,6 @@ def _build_summary(data):
     return "\n".join(lines)
 
 
-def _post_slack(channel, text):
-    if not SLACK_TOKEN or not channel:
-        print("ℹ️ Slack not configured, skipping.")
-        return
-    r = requests.post(
-        "https://slack.com/api/chat.postMessage",
-        headers={"Authorization": f"Bearer {SLACK_TOKEN}", "Content-Type": "application/json"},
-        json={"channel": channel, "text": text},
-    )
-    if r.ok and r.json().get("ok"):
-        print("📣 Slack update sent.")
-    else:
-        print(f"⚠️ Slack post failed: {r.status_code}")
-
-
 def main():
     try:
         _, relate_id = LesliesPoolApi.resolve_relate_customer_id(USERNAME, PASSWORD)
@@ -195,10 +178,10 @@ def main():
     summary = _build_summary(data)
     hour = now.strftime("%I").lstrip("0") or "12"
     human_time = now.strftime(f"%B %d, %Y at {hour}:%M %p")
-    _post_slack(SLACK_CHANNEL, f"New water test logged {human_time}:\n{summary}")
+    http_client.post_slack(SLACK_CHANNEL, f"New water test logged {human_time}:\n{summary}")
 
     if "🚨" in summary:
-        _post_slack(SLACK_CHANNEL, "🚨 One or more readings are outside operating limits. Fix immediately!")
+        http_client.post_slack(SLACK_CHANNEL, "🚨 One or more readings are outside operating limits. Fix immediately!")
 
 
 if __name__ == "__main__":
@@ -4,6 +4,7 @@ Format per line: year open_month open_day close_month close_day rate
 """
 
 import os
+from bisect import bisect_right
 from dataclasses import dataclass
 from datetime import date
 
@@ -37,23 +38,80 @@ def load(path: str | None = None) -> list[Season]:
     return seasons
 
 
+class SeasonIndex:
+    """Seasons sorted by open date, with bisect point lookups and vectorized array lookups.
+
+    The array methods take anything np.asarray can turn into datetime64[D]
+    (a NumPy date array, a pandas datetime Series, a list of dates) and return
+    one value per element, so callers never loop over rows in Python.
+    """
+
+    def __init__(self, seasons: list[Season]):
+        self.seasons = tuple(sorted(seasons, key=lambda s: s.open))
+        self._opens = [s.open for s in self.seasons]
+        self._by_year = {s.year: s for s in self.seasons}
+
+    def season_on(self, d: date) -> Season | None:
+        """The season whose open..close range contains *d*."""
+        i = bisect_right(self._opens, d) - 1
+        if i >= 0 and d <= self.seasons[i].close:
+            return self.seasons[i]
+        return None
+
+    def by_year(self, year: int) -> Season | None:
+        return self._by_year.get(year)
+
+    def _arrays(self):
+        import numpy as np
+        opens = np.array(self._opens, dtype="datetime64[D]")
+        closes = np.array([s.close for s in self.seasons], dtype="datetime64[D]")
+        return np, opens, closes
+
+    def season_ids(self, dates):
+        """Index into self.seasons of the season containing each date, -1 outside every season."""
+        np, opens, closes = self._arrays()
+        d = np.asarray(dates, dtype="datetime64[D]")
+        i = np.searchsorted(opens, d, side="right") - 1
+        inside = (i >= 0) & (d <= closes[np.maximum(i, 0)])
+        return np.where(inside, i, -1)
+
+    def rates(self, dates):
+        """Rate for each date's calendar year (get_rate semantics), NaN where no season is configured."""
+        np, _, _ = self._arrays()
+        years = np.asarray(dates, dtype="datetime64[Y]").astype(np.int64) + 1970
+        known = np.array(sorted(self._by_year), dtype=np.int64)
+        rate = np.array([self._by_year[y].rate for y in known.tolist()] + [np.nan])
+        j = np.searchsorted(known, years)
+        j = np.where((j < len(known)) & (known[np.minimum(j, len(known) - 1)] == years), j, len(known))
+        return rate[j]
+
+    def days_since_open(self, dates):
+        """Days from the containing season's open to each date, -1 outside every season."""
+        np, opens, _ = self._arrays()
+        d = np.asarray(dates, dtype="datetime64[D]")
+        ids = self.season_ids(d)
+        days = (d - opens[np.maximum(ids, 0)]).astype(np.int64)
+        return np.where(ids >= 0, days, -1)
+
+
 # module-level singleton, lazily loaded
-_cache: list[Season] | None = None
+_cache: SeasonIndex | None = None
 
 
-def _get() -> list[Season]:
+def index() -> SeasonIndex:
+    """The SeasonIndex for seasons.txt, built on first use."""
     global _cache
     if _cache is None:
-        _cache = load()
+        _cache = SeasonIndex(load())
     return _cache
 
 
 def get_rate(date_str: str) -> float:
     """Given a YYYY-MM-DD string, return the seasonal rate for that year."""
-    result = next((s.rate for s in _get() if s.year == int(date_str[:4])), None)
-    if result is None:
+    season = index().by_year(int(date_str[:4]))
+    if season is None:
         raise ValueError(f"No season configured for year {date_str[:4]}")
-    return result
+    return season.rate
 
 
 def get_rate_for_date(date_str: str) -> float:
@@ -65,12 +123,11 @@ def get_current_season(today: date | None = None) -> Season | None:
     """Return the season containing *today*, or None."""
     if today is None:
         import datetime
-        import pytz
-        central = pytz.timezone("US/Central")
-        today = datetime.datetime.now(central).date()
-    return next((s for s in _get() if s.open <= today <= s.close), None)
+        from zoneinfo import ZoneInfo
+        today = datetime.datetime.now(ZoneInfo("US/Central")).date()
+    return index().season_on(today)
 
 
 def get_season_by_year(year: int) -> Season | None:
     """Return the season for a specific year."""
-    return next((s for s in _get() if s.year == year), None)
+    return index().by_year(year)
@@ -0,0 +1,74 @@
+"""Import-time budget for the workflow entry points.
+
+Each entry point is imported in a fresh `python -X importtime` process and the
+cumulative time of its own import (best of --runs) is checked against its
+budget. Each one also lists heavy modules it must only import lazily, on the
+code paths that use them — a noise-free check that catches most regressions
+before the timing does.
+
+Usage: python startup_budget.py [--runs N] [--scale X]
+"""
+import argparse
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+# entry point: (budget in ms, modules it must not import at startup)
+BUDGETS = {
+    "check_flow":      (300,  ("numpy", "pandas", "matplotlib")),
+    "pull_flume":      (500,  ("pandas", "matplotlib", "pytz")),
+    "pull_leslies":    (350,  ("numpy", "pandas", "matplotlib")),
+    "build_dashboard": (400,  ("pandas", "matplotlib", "requests", "pytz")),
+    "update_plots":    (1000, ("matplotlib", "PIL", "requests")),  # pandas itself pulls in pytz
+    "flow_rollups":    (100,  ("numpy", "pandas", "matplotlib", "requests")),
+    "build_assets":    (100,  ("numpy", "pandas", "matplotlib", "requests")),
+}
+
+
+def _importtime(module):
+    """Return (cumulative µs for *module*, {imported module: cumulative µs}) from one cold import."""
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                          cwd=ROOT, capture_output=True, text=True)
+    if proc.returncode:
+        raise SystemExit(f"❌ import {module} failed:\n{proc.stderr[-2000:]}")
+    imported = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        imported[name.strip()] = int(cumulative)
+    return imported[module], imported
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Check entry-point import times against their budgets")
+    parser.add_argument("--runs", type=int, default=5, help="cold imports per entry point; the fastest counts")
+    parser.add_argument("--scale", type=float, default=1.0, help="multiply every budget (slow machines)")
+    args = parser.parse_args(argv)
+
+    failed = []
+    for module, (budget_ms, lazy) in BUDGETS.items():
+        runs = [_importtime(module) for _ in range(args.runs)]
+        total_us, imported = min(runs, key=lambda r: r[0])
+        limit_ms = budget_ms * args.scale
+        eager = [heavy for heavy in lazy if any(m == heavy or m.startswith(heavy + ".") for m in imported)]
+        ok = total_us / 1000 <= limit_ms and not eager
+        print(f"{'✅' if ok else '❌'} {module}: {total_us / 1000:.0f} ms (budget {limit_ms:.0f} ms)")
+        if eager:
+            print(f"   imports at startup: {', '.join(eager)} — move it onto the code path that needs it")
+        if not ok:
+            slowest = sorted(((us, m) for m, us in imported.items() if "." not in m and m != module),
+                             reverse=True)[:5]
+            print("   slowest top-level imports: " + ", ".join(f"{m} {us / 1000:.0f} ms" for us, m in slowest))
+            failed.append(module)
+
+    if failed:
+        print(f"❌ {len(failed)} entry point(s) over budget or importing eagerly: {', '.join(failed)}")
+        raise SystemExit(1)
+    print("✅ All entry points within their startup budget.")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,24 +1,55 @@
 """Regenerate all docs/*.png from current CSV logs.
 
-Run after any data pull, or directly: python update_plots.py
+Run after any data pull, or directly: python update_plots.py [--jobs N] [--force]
 """
-import csv
+import argparse
+import contextlib
 import datetime
+import hashlib
+import io
+import json
 import os
+import re
+import traceback
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
 
-import matplotlib.pyplot as plt
+from zoneinfo import ZoneInfo
+
+import numpy as np
 import pandas as pd
-import pytz
 
-from seasons_loader import get_current_season, load
+import log_cache
+import seasons_loader
+from seasons_loader import get_current_season, index, load
 
 DOCS = "docs"
 FLUME_CSV  = "logs/flume_usage_log.csv"
 LESLIES_CSV = "logs/leslies-log.csv"
 FLOW_CSV   = "logs/flow.csv"
+MANIFEST   = os.path.join(DOCS, "plots_manifest.json")
+SEASONS_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "seasons.txt")
 
 FLOW_STD_SCALE = 10  # multiply σ for visibility — pure visual aid, not a confidence interval
 GAP_THRESHOLD  = pd.Timedelta(hours=2)  # gaps wider than this break the line
+MAX_PLOT_POINTS = 1000  # ≈ pixel width of a 10-inch chart at 100 dpi; longer series are decimated
+
+# Pinned text rendering, so the same chart rasterizes to the same pixels on any runner.
+# DejaVu Sans ships inside matplotlib, unlike whatever sans-serif the OS provides.
+# Applied by _pyplot() when the first chart is drawn.
+DETERMINISTIC_RC = {
+    "font.family": "DejaVu Sans",
+    "text.hinting": "force_autohint",
+    "text.hinting_factor": 8,
+    "text.antialiased": True,
+    "lines.antialiased": True,
+    "patch.antialiased": True,
+    "path.simplify": True,
+}
+
+# Extra pixel widths each chart is also written at (as -<w>w.png/.webp), for phones and tablets
+RESPONSIVE_WIDTHS = (480, 768)
+WEBP_QUALITY = 80
 
 
 def _insert_gap_breakers(df, time_col="read_datetime"):
@@ -26,30 +57,116 @@ def _insert_gap_breakers(df, time_col="read_datetime"):
 
     This breaks matplotlib's line so gaps don't get interpolated visually.
     Only flags gaps in hourly-cadence data (2026-06-19 onward).
-    Returns (df_with_breaks, list_of_(gap_start, gap_end) tuples).
+    Returns (df_with_breaks, (gap_starts, gap_ends)) with the bounds as datetime64 arrays.
     """
     hourly_start = pd.Timestamp("2026-06-19")
-    df = df.sort_values(time_col).reset_index(drop=True)
-    diffs = df[time_col].diff()
-    gap_mask = (diffs > GAP_THRESHOLD) & (df[time_col] >= hourly_start)
-    gaps = []
-    nan_rows = []
-    for idx in df.index[gap_mask]:
-        gap_start = df.loc[idx - 1, time_col]
-        gap_end = df.loc[idx, time_col]
-        gaps.append((gap_start, gap_end))
-        mid = gap_start + (gap_end - gap_start) / 2
-        nan_row = {c: float("nan") if c != time_col else mid for c in df.columns}
-        nan_rows.append(nan_row)
-    if nan_rows:
-        df = pd.concat([df, pd.DataFrame(nan_rows)], ignore_index=True)
-        df = df.sort_values(time_col).reset_index(drop=True)
-    return df, gaps
+    if not df[time_col].is_monotonic_increasing:
+        df = df.sort_values(time_col, kind="stable")
+    df = df.reset_index(drop=True)
+    t = df[time_col].to_numpy()
+    gap_idx = np.flatnonzero((np.diff(t) > GAP_THRESHOLD) & (t[1:] >= hourly_start)) + 1
+    starts, ends = t[gap_idx - 1], t[gap_idx]
+    if not len(gap_idx):
+        return df, (starts, ends)
+
+    # One breaker row per gap, dropped into place by position — the input is
+    # already sorted, so there is no need to concat and sort again.
+    n, g = len(df), len(gap_idx)
+    breakers = pd.DataFrame(np.nan, index=range(g), columns=df.columns)
+    breakers[time_col] = starts + (ends - starts) / 2
+    shift = np.zeros(n, dtype=np.intp)
+    shift[gap_idx] = 1
+    order = np.empty(n + g, dtype=np.intp)
+    order[np.arange(n) + np.cumsum(shift)] = np.arange(n)
+    order[gap_idx + np.arange(g)] = n + np.arange(g)
+    df = pd.concat([df, breakers], ignore_index=True).take(order).reset_index(drop=True)
+    return df, (starts, ends)
+
+
+def _lttb_indices(x, y, n_out):
+    """Largest-Triangle-Three-Buckets: indices of *n_out* points that keep the shape of (x, y).
+
+    The first and last points are always kept; each bucket in between keeps the
+    point forming the largest triangle with the previous pick and the next bucket's mean.
+    """
+    n = len(x)
+    if n_out >= n:
+        return np.arange(n)
+    if n_out < 3:
+        return np.array([0, n - 1][:max(n_out, 1)])
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.intp)
+    picked = np.empty(n_out, dtype=np.intp)
+    picked[0], picked[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        lo, hi = edges[i], edges[i + 1]
+        if i + 2 < len(edges):
+            nx, ny = x[hi:edges[i + 2]].mean(), y[hi:edges[i + 2]].mean()
+        else:
+            nx, ny = x[-1], y[-1]
+        area = np.abs((x[a] - nx) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (ny - y[a]))
+        a = lo + int(np.argmax(area))
+        picked[i + 1] = a
+    return picked
+
+
+def _downsample(df, cols, max_points=MAX_PLOT_POINTS, time_col="read_datetime"):
+    """Decimate a sorted flow window to about *max_points* rows with LTTB.
+
+    Run this after _insert_gap_breakers: rows where every column in *cols* is NaN
+    (the gap breakers) are always kept and split the series into runs that are
+    decimated separately, so line breaks survive. Whole rows are kept, so
+    companion columns (flow_std, the other pressures) stay aligned with the line.
+    """
+    n = len(df)
+    if n <= max_points:
+        return df
+    x = df[time_col].to_numpy().astype("datetime64[ns]").astype(np.int64).astype(float)
+    ys = [df[col].to_numpy(dtype=float) for col in cols]
+    breaks = np.flatnonzero(np.logical_and.reduce([np.isnan(y) for y in ys]))
+    bounds = np.concatenate([[-1], breaks, [n]])
+    budget = max(max_points // len(cols), 3)
+    keep = [breaks]
+    for lo, hi in zip(bounds[:-1] + 1, bounds[1:]):
+        if hi <= lo:
+            continue
+        n_seg = max(3, round(budget * (hi - lo) / n))
+        for y in ys:
+            valid = np.flatnonzero(~np.isnan(y[lo:hi]))
+            if len(valid):
+                keep.append(lo + valid[_lttb_indices(x[lo:hi][valid], y[lo:hi][valid], n_seg)])
+    return df.iloc[np.unique(np.concatenate(keep))]
+
+
+def _pyplot():
+    """Import matplotlib on first use and apply DETERMINISTIC_RC.
+
+    matplotlib is most of update_plots' import time, and a run whose charts
+    are all unchanged never draws anything.
+    """
+    import matplotlib
+    matplotlib.use("Agg")
+    matplotlib.rcParams.update(DETERMINISTIC_RC)
+    import matplotlib.pyplot as plt
+    return plt
 
 
 def _shade_gaps(ax, gaps):
-    for start, end in gaps:
-        ax.axvspan(start, end, alpha=0.18, color="khaki", linewidth=0)
+    """Shade every gap span as a single full-height PolyCollection."""
+    import matplotlib.dates as mdates
+    from matplotlib.collections import PolyCollection
+
+    starts, ends = gaps
+    if not len(starts):
+        return
+    x0, x1 = mdates.date2num(starts), mdates.date2num(ends)
+    y0, y1 = np.zeros_like(x0), np.ones_like(x0)
+    verts = np.stack([np.column_stack(c) for c in ((x0, y0), (x0, y1), (x1, y1), (x1, y0))], axis=1)
+    ax.add_collection(
+        PolyCollection(verts, transform=ax.get_xaxis_transform(),
+                       alpha=0.18, facecolor="khaki", linewidth=0),
+        autolim=False,
+    )
 
 
 TARGET_RANGES = {
@@ -103,8 +220,7 @@ def _chem_bands(ax, key):
 
 def _season_range():
     """Return (start, end) dates for the plot window: current season, or most recent past season."""
-    central = pytz.timezone("US/Central")
-    today = datetime.datetime.now(pytz.utc).astimezone(central).date()
+    today = datetime.datetime.now(datetime.timezone.utc).astimezone(ZoneInfo("US/Central")).date()
     current = get_current_season(today)
     if current:
         return current.open, today
@@ -116,33 +232,66 @@ def _season_range():
 
 
 def _load_leslies():
+    """Current (or last) season's Leslie's tests, one float column per TARGET_RANGES key."""
     if not os.path.exists(LESLIES_CSV):
         return pd.DataFrame()
+    df = pd.DataFrame(log_cache.load("leslies")).dropna(subset=["test_date"])
+    df["test_date"] = df["test_date"].dt.date
     start, end = _season_range()
-    rows = []
-    with open(LESLIES_CSV, newline="") as f:
-        for r in csv.DictReader(f):
-            try:
-                d = datetime.datetime.strptime(r["test_date"], "%m/%d/%Y").date()
-            except ValueError:
-                continue
-            if start and (d < start or d > end):
-                continue
-            row = {"test_date": d}
-            for key in TARGET_RANGES:
-                try:
-                    v = float(r.get(key) or "nan")
-                    # 0 is below every target range minimum — treat as missing data
-                    # (legacy N/A entries were normalized to 0 before this was fixed)
-                    if v == 0 and TARGET_RANGES[key][0] > 0:
-                        v = float("nan")
-                    row[key] = v
-                except ValueError:
-                    row[key] = float("nan")
-            rows.append(row)
-    if not rows:
+    if start:
+        df = df[(df["test_date"] >= start) & (df["test_date"] <= end)]
+    if df.empty:
         return pd.DataFrame()
-    return pd.DataFrame(rows).sort_values("test_date").reset_index(drop=True)
+    out = df[["test_date", *TARGET_RANGES]].copy()
+    for key, (lo, _) in TARGET_RANGES.items():
+        # 0 is below every target range minimum — treat as missing data
+        # (legacy N/A entries were normalized to 0 before this was fixed)
+        if lo > 0:
+            out.loc[out[key] == 0, key] = float("nan")
+    return out.sort_values("test_date", kind="stable").reset_index(drop=True)
+
+
+def _load_flume():
+    """Daily Flume usage: date (datetime64), ccf (float), sorted by date."""
+    if not os.path.exists(FLUME_CSV):
+        return None
+    df = pd.DataFrame(log_cache.load("flume")).dropna(subset=["date"])
+    return df.sort_values("date", kind="stable").reset_index(drop=True)
+
+
+def _load_flow():
+    """Flow/pressure readings with numeric columns typed and combined_press precomputed."""
+    if not os.path.exists(FLOW_CSV):
+        return None
+    df = pd.DataFrame(log_cache.load("flow")).dropna(subset=["read_datetime"])
+    df["combined_press"] = df["vac_press"] + df["sys_press"]
+    return df.sort_values("read_datetime", kind="stable").reset_index(drop=True)
+
+
+@dataclass(frozen=True)
+class PlotData:
+    """Every log parsed once per run. A frame is None when its CSV is missing."""
+    today: datetime.date
+    flume: pd.DataFrame | None
+    leslies: pd.DataFrame
+    flow: pd.DataFrame | None
+
+
+def load_data() -> PlotData:
+    today = datetime.datetime.now(datetime.timezone.utc).astimezone(ZoneInfo("US/Central")).date()
+    return PlotData(today=today, flume=_load_flume(), leslies=_load_leslies(), flow=_load_flow())
+
+
+def _flow_window(flow, days):
+    """Readings from the last *days* days, or None if flow.csv is missing.
+
+    flow is sorted, so the window is a binary search plus a positional slice.
+    """
+    if flow is None:
+        return None
+    # log_cache columns are datetime64[s]; a cutoff with microseconds can't be searched losslessly
+    cutoff = pd.Timestamp(datetime.datetime.now() - datetime.timedelta(days=days)).floor("s")
+    return flow.iloc[flow["read_datetime"].searchsorted(cutoff):]
 
 
 def _ylim_for(key, col):
@@ -159,6 +308,64 @@ def _ylim_for(key, col):
     return y_lo, y_hi
 
 
+def _variant_paths(out_path):
+    """Every file _save writes for *out_path*, full-size PNG first."""
+    stem = os.path.splitext(out_path)[0]
+    paths = [out_path, f"{stem}.webp"]
+    for w in RESPONSIVE_WIDTHS:
+        paths += [f"{stem}-{w}w.png", f"{stem}-{w}w.webp"]
+    return paths
+
+
+def _encode(fig, path, dpi):
+    """Render *fig* to PNG or WebP bytes (by *path*'s extension) with no embedded metadata."""
+    buf = io.BytesIO()
+    if path.endswith(".webp"):
+        fig.savefig(buf, format="webp", dpi=dpi, pil_kwargs={"quality": WEBP_QUALITY})
+    else:
+        fig.savefig(buf, format="png", dpi=dpi, metadata={"Software": None})
+    return buf.getvalue()
+
+
+def _pixel_digest(src):
+    """Hash of the decoded pixels of an image file path or bytes — None if unreadable."""
+    from PIL import Image  # ships with matplotlib
+
+    try:
+        with Image.open(io.BytesIO(src) if isinstance(src, bytes) else src) as im:
+            return hashlib.sha256(f"{im.mode}{im.size}".encode() + im.tobytes()).hexdigest()
+    except (OSError, ValueError):
+        return None
+
+
+def _write_if_pixels_changed(path, data):
+    """Atomically write *data* to *path* unless the file there already decodes to the same pixels."""
+    if os.path.exists(path) and _pixel_digest(path) == _pixel_digest(data):
+        return False
+    tmp = f"{path}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(data)
+    os.replace(tmp, path)
+    return True
+
+
+def _save(fig, out_path):
+    """Write *fig* as a 100-dpi PNG at out_path plus WebP and smaller PNG/WebP renditions, then close it.
+
+    Renditions whose pixels match what is already on disk are left untouched,
+    so an unchanged chart never shows up in git diff.
+    """
+    written = 0
+    for path in _variant_paths(out_path):
+        m = re.search(r"-(\d+)w\.\w+$", path)
+        # renditions are re-rasterized at a lower dpi rather than resampled, so text stays crisp
+        dpi = int(m.group(1)) / fig.get_figwidth() if m else 100
+        written += _write_if_pixels_changed(path, _encode(fig, path, dpi))
+    _pyplot().close(fig)
+    name = os.path.basename(out_path)
+    print(f"  ✅ {name}" if written else f"  ⏭️  {name} pixels unchanged")
+
+
 def plot_chlorine(df, out_path):
     if df.empty:
         return
@@ -167,6 +374,7 @@ def plot_chlorine(df, out_path):
     combined = pd.concat([fc, tc])
     if combined.empty:
         return
+    plt = _pyplot()
     fig, ax = plt.subplots(figsize=(10, 4))
     _chem_bands(ax, "total_chlorine")
     if not fc.empty:
@@ -184,9 +392,7 @@ def plot_chlorine(df, out_path):
     ax.grid(True, alpha=0.3)
     fig.autofmt_xdate(rotation=45)
     plt.tight_layout()
-    plt.savefig(out_path, dpi=100)
-    plt.close()
-    print(f"  ✅ {os.path.basename(out_path)}")
+    _save(fig, out_path)
 
 
 def plot_chemical(df, key, out_path):
@@ -196,6 +402,7 @@ def plot_chemical(df, key, out_path):
     label, unit = LABELS_AND_UNITS.get(key, (key.replace("_", " ").title(), ""))
     ylabel = f"{label} ({unit})" if unit else label
     col = df[key].dropna()
+    plt = _pyplot()
     fig, ax = plt.subplots(figsize=(10, 4))
     _chem_bands(ax, key)
     ax.plot(df["test_date"], df[key], marker="o", color="navy", linewidth=1.5, markersize=5)
@@ -206,69 +413,46 @@ def plot_chemical(df, key, out_path):
     ax.grid(True, alpha=0.3)
     fig.autofmt_xdate(rotation=45)
     plt.tight_layout()
-    plt.savefig(out_path, dpi=100)
-    plt.close()
-    print(f"  ✅ {os.path.basename(out_path)}")
+    _save(fig, out_path)
 
 
-def plot_flume_usage(out_path):
-    if not os.path.exists(FLUME_CSV):
+def plot_flume_usage(recent, out_path):
+    if recent is None:
         print("  ⚠️  flume_usage_log.csv missing, skipping usage chart")
         return
-    central = pytz.timezone("US/Central")
-    today = datetime.datetime.now(pytz.utc).astimezone(central).date()
-    cutoff = today - datetime.timedelta(days=30)
-    dates, values = [], []
-    with open(FLUME_CSV, newline="") as f:
-        for row in csv.DictReader(f):
-            d = datetime.datetime.strptime(row["date"], "%Y-%m-%d").date()
-            if d >= cutoff:
-                dates.append(row["date"])
-                values.append(float(row["ccf"]))
-    if not dates:
+    if recent.empty:
         return
+    plt = _pyplot()
     fig, ax = plt.subplots(figsize=(10, 6))
-    ax.plot(dates, values, marker="o", color="teal")
+    ax.plot(recent["date"].dt.strftime("%Y-%m-%d").tolist(), recent["ccf"].tolist(),
+            marker="o", color="teal")
     ax.set_ylabel("Usage [CCF]")
     ax.set_title("Daily Water Usage – Last 30 Days")
     ax.grid(True)
     fig.autofmt_xdate(rotation=45)
     plt.tight_layout()
-    plt.savefig(out_path, dpi=100)
-    plt.close()
-    print(f"  ✅ {os.path.basename(out_path)}")
+    _save(fig, out_path)
 
 
-def plot_season_comparison(out_path):
-    if not os.path.exists(FLUME_CSV):
+def plot_season_comparison(flume, today, out_path):
+    if flume is None or flume.empty:
         return
-    central = pytz.timezone("US/Central")
-    today = datetime.datetime.now(pytz.utc).astimezone(central).date()
-    df_rows = []
-    with open(FLUME_CSV, newline="") as f:
-        for row in csv.DictReader(f):
-            d = datetime.datetime.strptime(row["date"], "%Y-%m-%d").date()
-            df_rows.append({"date": d, "year": d.year, "ccf": float(row["ccf"])})
-    if not df_rows:
-        return
-    df = pd.DataFrame(df_rows)
-    current = get_current_season(today)
-    records = []
-    for season in load():
-        year = season.year
-        end = today if (current and year == current.year) else season.close
-        sub = df[(df["year"] == year) & (df["date"] >= season.open) & (df["date"] <= end)].copy()
-        if sub.empty:
-            continue
-        sub["date"] = pd.to_datetime(sub["date"])
-        sub["days_since_open"] = (sub["date"] - pd.to_datetime(season.open)).dt.days
-        sub = sub.sort_values("date")
-        sub["rolling_avg"] = sub["ccf"].rolling(window=14, min_periods=1).mean()
-        sub["label"] = str(year)
-        records.append(sub[["days_since_open", "rolling_avg", "label"]])
-    if not records:
+    seasons = index()
+    ids = seasons.season_ids(flume["date"])
+    keep = ids >= 0
+    current = seasons.season_on(today)
+    if current:
+        # the current season is drawn through today only
+        keep &= (ids != seasons.seasons.index(current)) | (flume["date"] <= pd.Timestamp(today)).to_numpy()
+    if not keep.any():
         return
-    combined = pd.concat(records)
+    combined = flume[keep].assign(
+        days_since_open=seasons.days_since_open(flume["date"][keep]),
+        label=np.array([str(x.year) for x in seasons.seasons])[ids[keep]],
+    )
+    combined["rolling_avg"] = (combined.groupby("label")["ccf"]
+                               .transform(lambda ccf: ccf.rolling(window=14, min_periods=1).mean()))
+    plt = _pyplot()
     fig, ax = plt.subplots(figsize=(10, 6))
     for label, group in combined.groupby("label"):
         ax.plot(group["days_since_open"], group["rolling_avg"], label=label)
@@ -278,28 +462,22 @@ def plot_season_comparison(out_path):
     ax.grid(True)
     ax.legend(title="Year")
     plt.tight_layout()
-    plt.savefig(out_path, dpi=100)
-    plt.close()
-    print(f"  ✅ {os.path.basename(out_path)}")
+    _save(fig, out_path)
 
 
-def plot_flow(days, out_path):
-    if not os.path.exists(FLOW_CSV):
+def plot_flow(df, days, out_path):
+    if df is None:
         print(f"  ⚠️  flow.csv missing, skipping flow_{days}d chart")
         return
-    df = pd.read_csv(FLOW_CSV, parse_dates=["read_datetime"])
-    df = df.sort_values("read_datetime")
-    cutoff = datetime.datetime.now() - datetime.timedelta(days=days)
-    df = df[df["read_datetime"] >= cutoff].copy()
-    df["flow"] = pd.to_numeric(df["flow"], errors="coerce")
     if df.empty:
         print(f"  ⚠️  No flow data in last {days} days")
         return
     df, gaps = _insert_gap_breakers(df)
+    df = _downsample(df, ["flow"])
+    plt = _pyplot()
     fig, ax = plt.subplots(figsize=(10, 4))
     _shade_gaps(ax, gaps)
     if "flow_std" in df.columns:
-        df["flow_std"] = pd.to_numeric(df["flow_std"], errors="coerce")
         mask = df["flow"].notna() & df["flow_std"].notna()
         if mask.any():
             ax.fill_between(
@@ -317,24 +495,18 @@ def plot_flow(days, out_path):
     ax.grid(True, alpha=0.4)
     fig.autofmt_xdate(rotation=60)
     plt.tight_layout()
-    plt.savefig(out_path, dpi=100)
-    plt.close()
-    print(f"  ✅ {os.path.basename(out_path)}")
+    _save(fig, out_path)
 
 
-def plot_pressure(out_path):
-    if not os.path.exists(FLOW_CSV):
+def plot_pressure(df, out_path):
+    if df is None:
         print("  ⚠️  flow.csv missing, skipping pressure chart")
         return
-    df = pd.read_csv(FLOW_CSV, parse_dates=["read_datetime"])
-    df = df.sort_values("read_datetime")
-    cutoff = datetime.datetime.now() - datetime.timedelta(days=30)
-    df = df[df["read_datetime"] >= cutoff].copy()
-    df["flow"] = pd.to_numeric(df["flow"], errors="coerce")
-    df["combined_press"] = df["vac_press"] + df["sys_press"]
     if df.empty:
         return
     df, gaps = _insert_gap_breakers(df)
+    df = _downsample(df, ["combined_press", "f1_press", "flow"])
+    plt = _pyplot()
     fig, ax1 = plt.subplots(figsize=(10, 4))
     _shade_gaps(ax1, gaps)
     ax1.plot(df["read_datetime"], df["combined_press"],
@@ -356,29 +528,155 @@ def plot_pressure(out_path):
     plt.title("Pressures and Flow – Last 30 Days")
     fig.autofmt_xdate(rotation=60)
     plt.tight_layout()
-    plt.savefig(out_path, dpi=100)
-    plt.close()
-    print(f"  ✅ {os.path.basename(out_path)}")
+    _save(fig, out_path)
 
 
-def main():
-    os.makedirs(DOCS, exist_ok=True)
-
-    print("Flume plots:")
-    plot_flume_usage(os.path.join(DOCS, "flume_usage_chart.png"))
-    plot_season_comparison(os.path.join(DOCS, "flume_season_comparison.png"))
+def _chart_jobs(data):
+    """(section, func, args) for every chart, in output order.
 
-    print("Chemical plots:")
-    df_chem = _load_leslies()
-    plot_chlorine(df_chem, os.path.join(DOCS, "chlorine.png"))
+    Each job carries only the slice its plotter draws, so workers get a small
+    pickle and the manifest can hash exactly what ends up on the chart.
+    """
+    flume_30d = None
+    if data.flume is not None:
+        start = pd.Timestamp(data.today - datetime.timedelta(days=30))
+        flume_30d = data.flume.iloc[data.flume["date"].searchsorted(start):]
+    flow_30d = _flow_window(data.flow, 30)
+    jobs = [
+        ("Flume plots:", plot_flume_usage, (flume_30d, os.path.join(DOCS, "flume_usage_chart.png"))),
+        ("Flume plots:", plot_season_comparison,
+         (data.flume, data.today, os.path.join(DOCS, "flume_season_comparison.png"))),
+        ("Chemical plots:", plot_chlorine, (data.leslies, os.path.join(DOCS, "chlorine.png"))),
+    ]
     for key in ["ph", "alkalinity", "calcium", "cyanuric_acid", "iron", "copper", "phosphates"]:
-        plot_chemical(df_chem, key, os.path.join(DOCS, f"{key}.png"))
-
-    print("Flow/pressure plots:")
-    plot_flow(7,  os.path.join(DOCS, "flow_7d.png"))
-    plot_flow(30, os.path.join(DOCS, "flow_30d.png"))
-    plot_pressure(os.path.join(DOCS, "press.png"))
+        jobs.append(("Chemical plots:", plot_chemical, (data.leslies, key, os.path.join(DOCS, f"{key}.png"))))
+    jobs += [
+        ("Flow/pressure plots:", plot_flow, (_flow_window(data.flow, 7), 7, os.path.join(DOCS, "flow_7d.png"))),
+        ("Flow/pressure plots:", plot_flow, (flow_30d, 30, os.path.join(DOCS, "flow_30d.png"))),
+        ("Flow/pressure plots:", plot_pressure, (flow_30d, os.path.join(DOCS, "press.png"))),
+    ]
+    return jobs
+
+
+def _render_params_digest():
+    """Hash of every setting that changes how a chart looks: this file's code, the loaders it
+    draws through and seasons.txt (season dates and rates shape the season charts)."""
+    h = hashlib.sha256()
+    for path in (__file__, log_cache.__file__, seasons_loader.__file__, SEASONS_FILE):
+        if os.path.exists(path):
+            with open(path, "rb") as f:
+                h.update(f.read())
+    params = {
+        "TARGET_RANGES": TARGET_RANGES,
+        "CLOSURE_LIMITS": CLOSURE_LIMITS,
+        "LABELS_AND_UNITS": LABELS_AND_UNITS,
+        "FLOW_STD_SCALE": FLOW_STD_SCALE,
+        "GAP_THRESHOLD": str(GAP_THRESHOLD),
+        "MAX_PLOT_POINTS": MAX_PLOT_POINTS,
+        "RESPONSIVE_WIDTHS": RESPONSIVE_WIDTHS,
+        "WEBP_QUALITY": WEBP_QUALITY,
+        "DETERMINISTIC_RC": DETERMINISTIC_RC,
+    }
+    h.update(json.dumps(params, sort_keys=True).encode())
+    return h.hexdigest()
+
+
+def _job_digest(func, args, params_digest):
+    """Hash of a chart's plotter, input slice, window bounds and render parameters."""
+    h = hashlib.sha256()
+    h.update(func.__name__.encode())
+    h.update(params_digest.encode())
+    for arg in args[:-1]:  # last arg is out_path
+        if isinstance(arg, pd.DataFrame):
+            h.update(repr(list(zip(arg.columns, map(str, arg.dtypes)))).encode())
+            if not arg.empty:
+                h.update(pd.util.hash_pandas_object(arg, index=False).values.tobytes())
+        else:
+            h.update(repr(arg).encode())
+        h.update(b"\0")
+    return h.hexdigest()
+
+
+def _load_manifest():
+    if not os.path.exists(MANIFEST):
+        return {}
+    with open(MANIFEST) as f:
+        return json.load(f)
+
+
+def _write_manifest(manifest):
+    tmp = MANIFEST + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+        f.write("\n")
+    os.replace(tmp, MANIFEST)
+
+
+def _render(func, args):
+    """Run one plotter, returning (captured stdout, traceback or None)."""
+    out = io.StringIO()
+    err = None
+    with contextlib.redirect_stdout(out):
+        try:
+            func(*args)
+        except Exception:
+            err = traceback.format_exc()
+            _pyplot().close("all")
+    return out.getvalue(), err
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--jobs", type=int, default=os.cpu_count() or 1,
+                        help="worker processes for rendering (1 = render in-process; default: all cores)")
+    parser.add_argument("--force", action="store_true",
+                        help="re-render every chart, ignoring the manifest")
+    args = parser.parse_args(argv)
 
+    os.makedirs(DOCS, exist_ok=True)
+    data = load_data()
+    jobs = _chart_jobs(data)
+
+    # Skip charts whose inputs hash the same as when their PNG was last written
+    manifest = {} if args.force else _load_manifest()
+    params_digest = _render_params_digest()
+    digests = [_job_digest(func, fargs, params_digest) for _, func, fargs in jobs]
+    todo = [i for i, ((_, _, fargs), digest) in enumerate(zip(jobs, digests))
+            if manifest.get(os.path.basename(fargs[-1])) != digest
+            or not all(map(os.path.exists, _variant_paths(fargs[-1])))]
+
+    results = {}
+    if args.jobs > 1 and len(todo) > 1:
+        with ProcessPoolExecutor(max_workers=min(args.jobs, len(todo))) as pool:
+            futures = {i: pool.submit(_render, jobs[i][1], jobs[i][2]) for i in todo}
+            results = {i: f.result() for i, f in futures.items()}
+    else:
+        results = {i: _render(jobs[i][1], jobs[i][2]) for i in todo}
+
+    # Logs and errors are reported in job order, whichever worker finished first
+    failed = []
+    section = None
+    for i, (sec, func, fargs) in enumerate(jobs):
+        if sec != section:
+            print(sec)
+            section = sec
+        name = os.path.basename(fargs[-1])
+        if i not in results:
+            print(f"  ⏭️  {name} unchanged")
+            continue
+        out, err = results[i]
+        print(out, end="")
+        if err:
+            print(f"  ❌ {name} failed:\n{err}", end="")
+            failed.append(name)
+            manifest.pop(name, None)
+        else:
+            manifest[name] = digests[i]
+    _write_manifest(manifest)
+
+    if failed:
+        print(f"❌ {len(failed)} plot(s) failed: {', '.join(failed)}")
+        raise SystemExit(1)
     print("✅ All plots complete.")
 
 